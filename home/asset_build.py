@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+
+from PIL import Image, ImageSequence
+
+from home.assets import ASSET_SOURCES, MANIFEST_PATH, MANIFEST_VERSION, file_digest
+
+# Builds display-sized variants of the step GIFs under static/build/:
+#   - an animated WebP, shown by URL (home.assets.image_url) so it stays animated
+#   - a still PNG poster of the first frame
+#   - an H.264 MP4, when ffmpeg is on the PATH
+# then publishes every logical asset in home.assets.ASSET_SOURCES (the GIFs as
+# their optimized variant) under a content-hashed file name. The manifest maps
+# logical names to those files.
+#
+# Rebuild after adding or changing any asset:
+#     python -m home.asset_build
+
+SOURCE_DIR = os.path.join("static", "gif")
+BUILD_DIR = os.path.dirname(MANIFEST_PATH)
+
+# The GIFs sit in a narrow column next to the agent's reply; this covers it at 2x
+MAX_WIDTH = 480
+WEBP_QUALITY = 80
+# Hex digits of the content hash kept in file names
+HASH_LENGTH = 10
+
+
+def fingerprinted_name(path, stem):
+    """stem.<content hash>.ext for the file at path."""
+    return f"{stem}.{file_digest(path)[:HASH_LENGTH]}{os.path.splitext(path)[1]}"
+
+
+def publish(path, build_dir, stem):
+    """Move a freshly built file to its fingerprinted name and return the new path."""
+    target = os.path.join(build_dir, fingerprinted_name(path, stem))
+    os.replace(path, target)
+    return target
+
+
+def load_frames(path, max_width=MAX_WIDTH):
+    """The GIF's frames as RGBA images no wider than max_width, with their durations."""
+    with Image.open(path) as gif:
+        scale = min(1.0, max_width / gif.width)
+        size = (round(gif.width * scale), round(gif.height * scale))
+        frames, durations = [], []
+        for frame in ImageSequence.Iterator(gif):
+            durations.append(frame.info.get("duration", gif.info.get("duration", 100)))
+            frame = frame.convert("RGBA")
+            if frame.size != size:
+                frame = frame.resize(size, Image.LANCZOS)
+            frames.append(frame)
+    return frames, durations
+
+
+def write_webp(frames, durations, path):
+    frames[0].save(path, "WEBP", save_all=True, append_images=frames[1:], duration=durations,
+                   loop=0, quality=WEBP_QUALITY, method=6)
+
+
+def write_poster(frames, path):
+    frames[0].save(path, "PNG", optimize=True)
+
+
+def write_mp4(source, path, width):
+    """Transcode with ffmpeg; returns False when ffmpeg isn't installed or fails."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return False
+    # yuv420p needs even dimensions
+    scale = f"scale={width}:-2:flags=lanczos,pad=ceil(iw/2)*2:ceil(ih/2)*2"
+    result = subprocess.run(
+        [ffmpeg, "-y", "-loglevel", "error", "-i", source, "-vf", scale,
+         "-c:v", "libx264", "-pix_fmt", "yuv420p", "-movflags", "+faststart", "-an", path],
+        capture_output=True
+    )
+    if result.returncode != 0:
+        print(f"ffmpeg failed for {source}: {result.stderr.decode(errors='replace').strip()}")
+        return False
+    return True
+
+
+def build_gif(source, build_dir=BUILD_DIR, max_width=MAX_WIDTH):
+    """Build the variants for one GIF and return its manifest entry."""
+    name = os.path.splitext(os.path.basename(source))[0]
+    frames, durations = load_frames(source, max_width)
+    width, height = frames[0].size
+
+    entry = {
+        "source": source,
+        "source_sha256": file_digest(source),
+        "width": width,
+        "height": height,
+        "frames": len(frames),
+        "bytes": {"source": os.path.getsize(source)},
+    }
+    outputs = {
+        "webp": os.path.join(build_dir, f"{name}.webp"),
+        "poster": os.path.join(build_dir, f"{name}-poster.png"),
+        "mp4": os.path.join(build_dir, f"{name}.mp4"),
+    }
+    write_webp(frames, durations, outputs["webp"])
+    write_poster(frames, outputs["poster"])
+    if not write_mp4(source, outputs["mp4"], width):
+        del outputs["mp4"]
+
+    # Some small, flat GIFs compress better as GIF; keep the original then
+    if os.path.getsize(outputs["webp"]) >= entry["bytes"]["source"]:
+        os.remove(outputs.pop("webp"))
+
+    for kind, path in outputs.items():
+        entry["bytes"][kind] = os.path.getsize(path)
+        entry[kind] = publish(path, build_dir, os.path.splitext(os.path.basename(path))[0])
+    return entry
+
+
+def build_assets(source_dir=SOURCE_DIR, build_dir=BUILD_DIR, max_width=MAX_WIDTH):
+    os.makedirs(build_dir, exist_ok=True)
+    manifest = {"version": MANIFEST_VERSION, "gifs": {}, "assets": {}}
+    for filename in sorted(os.listdir(source_dir)):
+        if not filename.lower().endswith(".gif"):
+            continue
+        source = os.path.join(source_dir, filename)
+        entry = build_gif(source, build_dir, max_width)
+        manifest["gifs"][source] = entry
+        sizes = ", ".join(f"{kind} {size // 1024} KB" for kind, size in entry["bytes"].items())
+        print(f"{source}: {sizes}")
+
+    for name, source in ASSET_SOURCES.items():
+        if not os.path.exists(source):
+            print(f"Skipping {name}: {source} not found")
+            continue
+        optimized = manifest["gifs"].get(source, {}).get("webp")
+        if optimized is not None:
+            path = optimized
+        else:
+            path = os.path.join(build_dir, fingerprinted_name(source, name))
+            shutil.copyfile(source, path)
+        # asset_path falls back to the source once it no longer matches this digest
+        manifest["assets"][name] = {"source": source, "source_sha256": file_digest(source), "path": path}
+
+    remove_stale_outputs(manifest, build_dir)
+    return manifest
+
+
+def remove_stale_outputs(manifest, build_dir=BUILD_DIR):
+    """Delete files left in build_dir by earlier builds."""
+    current = {entry["path"] for entry in manifest["assets"].values()}
+    for entry in manifest["gifs"].values():
+        current.update(entry.get(kind) for kind in ("webp", "poster", "mp4"))
+    current.add(MANIFEST_PATH)
+    for filename in os.listdir(build_dir):
+        path = os.path.join(build_dir, filename)
+        if path not in current:
+            os.remove(path)
+
+
+def write_manifest(manifest, path=MANIFEST_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build optimized GIF variants and the fingerprinted asset manifest.")
+    parser.add_argument("--max-width", type=int, default=MAX_WIDTH, help="Widest output, in pixels")
+    args = parser.parse_args()
+
+    write_manifest(build_assets(max_width=args.max_width))
+    print(f"Wrote {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
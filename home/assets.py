@@ -0,0 +1,120 @@
+import base64
+import functools
+import hashlib
+import json
+import mimetypes
+import os
+
+import streamlit as st
+
+# Files under static/ are served by Streamlit at app/static/... when
+# server.enableStaticServing is on (see .streamlit/config.toml). Pages then only
+# send a short URL on each rerun instead of the file's bytes.
+
+
+def static_serving_enabled():
+    return bool(st.get_option("server.enableStaticServing"))
+
+
+def asset_url(path):
+    """
+    URL for a file under static/, e.g. asset_url("static/images/background.png").
+
+    Falls back to a data URI, encoded once per process, when static serving
+    is turned off.
+    """
+    path = path.removeprefix("./")
+    if static_serving_enabled():
+        return f"app/{path}"
+    return data_uri(path)
+
+
+def image_url(path):
+    """
+    asset_url for st.image.
+
+    st.image re-encodes local files (an animated WebP becomes a still PNG), but
+    passes data URIs and absolute /app/static/ URLs through untouched.
+    """
+    url = asset_url(path)
+    return f"/{url}" if url.startswith("app/") else url
+
+
+@functools.lru_cache(maxsize=None)
+def data_uri(path):
+    mime_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    with open(path, "rb") as f:
+        return f"data:{mime_type};base64,{base64.b64encode(f.read()).decode()}"
+
+
+# Logical asset names and their source files. home.asset_build publishes each
+# one under static/build/ with a content hash in its file name, so the served
+# URL changes whenever the file does and can be cached indefinitely.
+ASSET_SOURCES = {
+    "main-css": "static/css/main.css",
+    "background": "static/images/background.png",
+    "recorder": "static/images/recorder.png",
+    "bird": "static/gif/bird.gif",
+    **{f"step-{step}": f"static/gif/{step}.gif" for step in range(1, 7)},
+    "calm_piano": "static/audio/calm_piano.wav",
+    "nature_music": "static/audio/nature_music.wav",
+}
+
+MANIFEST_PATH = "static/build/manifest.json"
+MANIFEST_VERSION = 3
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """The manifest written by home.asset_build, or an empty one if not built."""
+    empty = {"gifs": {}, "assets": {}}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return empty
+    except (OSError, ValueError) as e:
+        print(f"Could not load asset manifest {path}: {e}")
+        return empty
+    if manifest.get("version") != MANIFEST_VERSION:
+        print(f"Ignoring asset manifest {path}: version {manifest.get('version')}, expected {MANIFEST_VERSION}")
+        return empty
+    return manifest
+
+
+_manifest = load_manifest()
+
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path, mtime_ns, size):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def file_digest(path):
+    """SHA-256 of a file, recomputed only when its modification time or size changes."""
+    stat = os.stat(path)
+    return _file_digest(path, stat.st_mtime_ns, stat.st_size)
+
+
+def _is_current(entry, output):
+    """Whether a manifest entry's output exists and was built from the source as it is now."""
+    if not output or not os.path.exists(output):
+        return False
+    try:
+        return entry.get("source_sha256") == file_digest(entry["source"])
+    except (KeyError, OSError):
+        return False
+
+
+def asset_path(name):
+    """
+    File path of a logical asset, e.g. asset_path("step-4").
+
+    The fingerprinted build output when it was built from the current source
+    file, otherwise the source file under static/, so an edited asset shows
+    up before home.asset_build is run again.
+    """
+    entry = _manifest["assets"].get(name, {})
+    if _is_current(entry, entry.get("path")):
+        return entry["path"]
+    return ASSET_SOURCES[name]
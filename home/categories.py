@@ -0,0 +1,24 @@
+# Topics offered on the welcome step. Kept in their own module so offline
+# tools (e.g. the video index builder) can use them without Streamlit.
+CATEGORY_PLACEHOLDER = "Select an topic..."
+OTHER_CATEGORY = "Other (please specify)"
+
+PREDEFINED_CATEGORIES = [
+    "Women in Leadership & Glass Ceiling",
+    "Gender Inequality in Education",
+    "Workplace Gender Discrimination",
+    "Pregnancy & Parenting Challenges",
+    "Domestic Violence",
+    "Work-Life Balance Struggles",
+    "Body Image & Beauty Standards",
+    "Online Harassment & Cyberstalking",
+    "Offline Harassment",
+    "Unhealthy Relationships"
+]
+
+CATEGORY_OPTIONS = [CATEGORY_PLACEHOLDER] + PREDEFINED_CATEGORIES + [OTHER_CATEGORY]
+
+
+def video_search_query(category):
+    """The YouTube search used for a topic, live or when building the video index."""
+    return f"deal with {category} problems"
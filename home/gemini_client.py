@@ -0,0 +1,128 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+
+MODEL_NAME = "gemini-pro"
+
+# Upper bound on distinct API keys kept connected at once. The least recently
+# used key is dropped when a new key pushes past it; its channel closes once
+# any in-flight call still holding it finishes.
+MAX_CLIENTS = int(os.environ.get("HERSPACE_GEMINI_MAX_CLIENTS", "64"))
+
+# gRPC channel options: keep the HTTP/2 connection warm between agent clicks
+# instead of re-handshaking after idle periods.
+CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.max_send_message_length", -1),
+    ("grpc.max_receive_message_length", -1),
+]
+
+# Per-process salt so key fingerprints can't be matched across restarts or logs
+_KEY_SALT = os.urandom(16)
+
+
+def key_fingerprint(api_key):
+    """Salted hash identifying an API key without holding on to it as a dict key."""
+    return hashlib.sha256(_KEY_SALT + api_key.encode("utf-8")).hexdigest()
+
+
+class GeminiClients:
+    """
+    The Gemini service clients for one API key.
+
+    All services share one explicitly created gRPC channel authenticated with
+    that key, so every call for the key reuses the same kept-alive connection
+    and nothing depends on the process-global genai.configure().
+    """
+
+    def __init__(self, api_key):
+        # The Google client libraries take most of a second to import, so they
+        # are loaded when the first client is built rather than at app start
+        from google.ai import generativelanguage as glm
+        from google.ai.generativelanguage_v1beta.services.cache_service.transports import CacheServiceGrpcTransport
+        from google.ai.generativelanguage_v1beta.services.generative_service.transports import GenerativeServiceGrpcTransport
+        from google.ai.generativelanguage_v1beta.services.model_service.transports import ModelServiceGrpcTransport
+        from google.auth import api_key as api_key_credentials
+
+        credentials = api_key_credentials.Credentials(api_key)
+        self.channel = GenerativeServiceGrpcTransport.create_channel(
+            credentials=credentials,
+            options=CHANNEL_OPTIONS
+        )
+        self.generative = glm.GenerativeServiceClient(
+            transport=GenerativeServiceGrpcTransport(channel=self.channel)
+        )
+        self.models = glm.ModelServiceClient(
+            transport=ModelServiceGrpcTransport(channel=self.channel)
+        )
+        self.cache = glm.CacheServiceClient(
+            transport=CacheServiceGrpcTransport(channel=self.channel)
+        )
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def model(self, model_name=MODEL_NAME):
+        """A GenerativeModel bound to this key's client rather than the global default."""
+        import google.generativeai as genai
+
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is None:
+                model = genai.GenerativeModel(model_name=model_name)
+                model._client = self.generative
+                self._models[model_name] = model
+            return model
+
+    def cached_model(self, cached_content_name, model_name):
+        """A GenerativeModel whose context starts with an existing cached-content resource."""
+        import google.generativeai as genai
+
+        model = genai.GenerativeModel(model_name=model_name)
+        model._client = self.generative
+        model._cached_content = cached_content_name
+        return model
+
+
+class GeminiClientRegistry:
+    """Process-wide, thread-safe registry of GeminiClients keyed by key fingerprint."""
+
+    def __init__(self, max_clients=MAX_CLIENTS):
+        self.max_clients = max_clients
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, api_key):
+        if not api_key:
+            raise ValueError("A Gemini API key is required.")
+
+        fingerprint = key_fingerprint(api_key)
+        with self._lock:
+            clients = self._clients.get(fingerprint)
+            if clients is None:
+                clients = GeminiClients(api_key)
+                self._clients[fingerprint] = clients
+                while len(self._clients) > self.max_clients:
+                    self._clients.popitem(last=False)
+            else:
+                self._clients.move_to_end(fingerprint)
+            return clients
+
+    def __len__(self):
+        return len(self._clients)
+
+
+registry = GeminiClientRegistry()
+
+
+def get_clients(api_key):
+    return registry.get(api_key)
+
+
+def get_model(api_key, model_name=MODEL_NAME):
+    """The shared GenerativeModel for api_key; use this instead of genai.configure()."""
+    return registry.get(api_key).model(model_name)
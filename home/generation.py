@@ -0,0 +1,115 @@
+import os
+
+from home.gemini_client import key_fingerprint
+from home.prefix_cache import drop_cached_prefix, is_cached_content_error, prefixed_model
+from home.prompts import EMPOWERMENT_PROMPT_PREFIX, build_empowerment_suffix
+from home.scheduler import scheduler
+from home.section_parser import SectionStreamParser, parse_sections
+
+# Final-response generation without any Streamlit calls, so it can also run on
+# background worker threads (see home/speculation.py).
+
+# Longest a single final-response request may run before the API call is abandoned
+GEMINI_TIMEOUT_SECONDS = float(os.environ.get("HERSPACE_GEMINI_TIMEOUT", "90"))
+
+
+def build_final_prompt_suffix(form_data, previous_responses):
+    """The user-specific part of the final prompt for the collected form data."""
+    return build_empowerment_suffix(
+        category=form_data["category"],
+        situation=form_data["situation"],
+        thoughts=form_data["thoughts"],
+        emotions=form_data["primary_emotion"],
+        emotion_intensity=form_data["emotion_intensity"],
+        support_system=form_data["support_system"],
+        strengths=form_data["strengths"],
+        goal=form_data["goal"],
+        extra_notes=form_data["extra_notes"],
+        previous_responses=previous_responses
+    )
+
+
+def chunk_texts(response):
+    """Text of each chunk of a streamed Gemini response."""
+    for chunk in response:
+        try:
+            yield chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. safety feedback) carry nothing to show
+            continue
+
+
+def forget_stale_prefix(api_key, error):
+    """
+    Whether to retry with the full prompt after a request on the cached prefix
+    failed; if so, the prefix is dropped so the next request uploads it again.
+    """
+    if not is_cached_content_error(error):
+        return False
+    print(f"Cached prompt prefix is no longer usable, retrying with the full prompt: {error}")
+    drop_cached_prefix(api_key, EMPOWERMENT_PROMPT_PREFIX)
+    return True
+
+
+def final_response_texts(api_key, prompt_suffix, prefixed):
+    """
+    Text chunks of the streamed final response; `prefixed` is prefixed_model's result.
+
+    If Gemini no longer has the cached prefix (deleted or expired server-side)
+    and nothing has been received yet, the request is retried once with the
+    full prompt.
+    """
+    model, prompt, cached = prefixed
+    received = False
+    try:
+        for text in chunk_texts(model.generate_content(prompt, stream=True, request_options={"timeout": GEMINI_TIMEOUT_SECONDS})):
+            received = True
+            yield text
+        return
+    except Exception as e:
+        if not cached or received or not forget_stale_prefix(api_key, e):
+            raise
+    model, prompt, _ = prefixed_model(api_key, EMPOWERMENT_PROMPT_PREFIX, prompt_suffix, use_cache=False)
+    yield from chunk_texts(model.generate_content(prompt, stream=True, request_options={"timeout": GEMINI_TIMEOUT_SECONDS}))
+
+
+def stream_final_sections(api_key, prompt_suffix, on_wait=None, should_stop=None, on_chunk=None):
+    """
+    Yield (section, text) pairs of the final response as each
+    [X_START]...[X_END] block completes.
+
+    The scheduler slot is held until the stream ends; on_wait receives the
+    queue position while waiting for it. should_stop is checked before the
+    prefix lookup, once the slot is granted and after every chunk, and ends
+    the stream early (without a request, if it hasn't been sent yet) when it
+    returns True; on_chunk, if given, is called after every chunk.
+    """
+    if should_stop is not None and should_stop():
+        return
+    prefixed = prefixed_model(api_key, EMPOWERMENT_PROMPT_PREFIX, prompt_suffix)
+    with scheduler.turn(key_fingerprint(api_key), on_wait=on_wait):
+        if should_stop is not None and should_stop():
+            return
+        parser = SectionStreamParser()
+        for text in final_response_texts(api_key, prompt_suffix, prefixed):
+            if should_stop is not None and should_stop():
+                return
+            if on_chunk is not None:
+                on_chunk()
+            yield from parser.feed(text)
+        # Sections the model never closed are reported empty, like the blocking path
+        yield from parser.close()
+
+
+def generate_final_sections(api_key, prompt_suffix, on_wait=None):
+    """Generate the whole final response and return it as a {section: text} dict."""
+    model, prompt, cached = prefixed_model(api_key, EMPOWERMENT_PROMPT_PREFIX, prompt_suffix)
+    with scheduler.turn(key_fingerprint(api_key), on_wait=on_wait):
+        try:
+            response = model.generate_content(prompt, request_options={"timeout": GEMINI_TIMEOUT_SECONDS})
+        except Exception as e:
+            if not cached or not forget_stale_prefix(api_key, e):
+                raise
+            model, prompt, _ = prefixed_model(api_key, EMPOWERMENT_PROMPT_PREFIX, prompt_suffix, use_cache=False)
+            response = model.generate_content(prompt, request_options={"timeout": GEMINI_TIMEOUT_SECONDS})
+    return parse_sections(response.candidates[0].content.parts[0].text)
@@ -0,0 +1,96 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# Cold-start check for the app's own imports, measured with `python -X importtime`.
+# Streamlit itself is imported first and not counted; what's left is the cost
+# of the entry point and the default page's modules. Fails when that goes over
+# budget or when one of the heavy client libraries is imported at startup.
+#
+#     python -m home.import_budget --budget-ms 150
+
+# What a cold start imports: the entry point and the default (home) page
+COLD_START_MODULES = ["streamlit_llm", "home.get_empowerment_solution"]
+# Loaded on first use by the code that needs them, never at startup
+LAZY_MODULES = ["google.generativeai", "googleapiclient", "folium", "googlemaps", "geopy"]
+DEFAULT_BUDGET_MS = float(os.environ.get("HERSPACE_IMPORT_BUDGET_MS", "150"))
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(output):
+    """(module, self µs, cumulative µs, depth) for each line of -X importtime output."""
+    records = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return records
+
+
+def measure(modules=COLD_START_MODULES):
+    """
+    Import modules in a fresh interpreter after streamlit.
+
+    Returns:
+        tuple: (milliseconds spent on them, their -X importtime records)
+    """
+    code = "import streamlit\n" + "".join(f"import {module}\n" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n{result.stderr}")
+
+    records = parse_importtime(result.stderr)
+    # Records are written as imports finish, so everything after streamlit's own top-level line is ours
+    start = next(i for i, (module, _, _, depth) in enumerate(records) if module == "streamlit" and depth == 0) + 1
+    ours = records[start:]
+    total_us = sum(cumulative for _, _, cumulative, depth in ours if depth == 0)
+    return total_us / 1000, ours
+
+
+def eager_lazy_modules(records, lazy_modules=LAZY_MODULES):
+    """The lazy modules that were imported anyway."""
+    imported = {module for module, _, _, _ in records}
+    return [lazy for lazy in lazy_modules
+            if any(module == lazy or module.startswith(lazy + ".") for module in imported)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when the app's cold-start imports go over budget.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Allowed import time for the app's modules, after streamlit")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure; the median is used")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    timings = []
+    for _ in range(args.runs):
+        elapsed_ms, records = measure()
+        timings.append(elapsed_ms)
+    median_ms = statistics.median(timings)
+
+    print(f"Cold-start imports: {median_ms:.1f} ms (median of {args.runs}), budget {args.budget_ms:.0f} ms")
+    for module, _, cumulative, _ in sorted(records, key=lambda record: record[2], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {module}")
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"import time {median_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+    eager = eager_lazy_modules(records)
+    if eager:
+        failures.append(f"imported at startup but should load on first use: {', '.join(eager)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import os
+import threading
+from concurrent.futures import Future
+
+from home.cache import TTLCache
+from home.gemini_client import get_clients, key_fingerprint
+
+
+# How long a key that passed validation is trusted before it's probed again
+VALID_KEY_TTL_SECONDS = float(os.environ.get("HERSPACE_KEY_VALID_TTL", "3600"))
+# Rejected keys are remembered for less time, in case the user fixes the key's project
+INVALID_KEY_TTL_SECONDS = float(os.environ.get("HERSPACE_KEY_INVALID_TTL", "300"))
+# The probe is a metadata call, so it shouldn't take long
+PROBE_TIMEOUT_SECONDS = float(os.environ.get("HERSPACE_KEY_PROBE_TIMEOUT", "10"))
+
+
+class KeyValidation:
+    """Outcome of validating an API key; `error` explains a failure."""
+
+    def __init__(self, valid, error=None):
+        self.valid = valid
+        self.error = error
+
+    def __bool__(self):
+        return self.valid
+
+
+def probe_api_key(api_key):
+    """
+    Check a key with a single models.list call instead of a billed generation.
+
+    Returns:
+        KeyValidation
+
+    Raises:
+        Errors that say nothing about the key, e.g. a network failure
+    """
+    from google.api_core import exceptions as google_exceptions
+
+    # Errors that mean the key itself is bad; anything else (network, quota) is not cached
+    rejected_key_errors = (
+        google_exceptions.InvalidArgument,
+        google_exceptions.PermissionDenied,
+        google_exceptions.Unauthenticated,
+    )
+    try:
+        get_clients(api_key).models.list_models(page_size=1, timeout=PROBE_TIMEOUT_SECONDS)
+    except rejected_key_errors as e:
+        return KeyValidation(False, getattr(e, "message", None) or str(e))
+    return KeyValidation(True)
+
+
+class KeyValidator:
+    """
+    Validates API keys, caching outcomes by salted key fingerprint.
+
+    Concurrent validations of the same key share one probe rather than each
+    sending their own.
+    """
+
+    def __init__(self, probe=probe_api_key, valid_ttl=VALID_KEY_TTL_SECONDS,
+                 invalid_ttl=INVALID_KEY_TTL_SECONDS, max_size=1024):
+        self.probe = probe
+        self.valid_ttl = valid_ttl
+        self.invalid_ttl = invalid_ttl
+        self.results = TTLCache(max_size=max_size, ttl_seconds=valid_ttl)
+        self._in_flight = {}  # fingerprint -> Future of the running probe
+        self._lock = threading.Lock()
+
+    def validate(self, api_key):
+        """
+        Returns:
+            KeyValidation
+
+        Raises:
+            The probe's error when it failed for reasons unrelated to the key
+        """
+        if not api_key:
+            return KeyValidation(False, "No API key was entered.")
+
+        fingerprint = key_fingerprint(api_key)
+        result = self.results.get(fingerprint)
+        if result is not None:
+            return result
+
+        with self._lock:
+            future = self._in_flight.get(fingerprint)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[fingerprint] = future
+        if not owner:
+            return future.result()
+
+        try:
+            result = self.probe(api_key)
+            self.results.set(fingerprint, result, self.valid_ttl if result.valid else self.invalid_ttl)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[fingerprint]
+
+    def forget(self, api_key):
+        self.results.pop(key_fingerprint(api_key))
+
+
+key_validator = KeyValidator()
+
+
+def validate_api_key(api_key):
+    return key_validator.validate(api_key)
@@ -0,0 +1,83 @@
+import os
+import re
+from collections import OrderedDict
+
+from home.tokens import estimate_tokens, truncate_to_tokens
+
+
+# Most tokens of earlier agent replies resent with each prompt
+MEMORY_TOKEN_CEILING = int(os.environ.get("HERSPACE_MEMORY_TOKEN_CEILING", "600"))
+# How many of the latest replies are kept in full (within the ceiling)
+RECENT_STEPS = int(os.environ.get("HERSPACE_MEMORY_RECENT_STEPS", "2"))
+# Size of the one-line summary kept for each older reply
+SUMMARY_TOKENS_PER_STEP = int(os.environ.get("HERSPACE_MEMORY_SUMMARY_TOKENS", "40"))
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def summarize_response(response, max_tokens=SUMMARY_TOKENS_PER_STEP):
+    """Extractive summary: the leading sentences of a reply that fit max_tokens."""
+    summary = ""
+    for sentence in _SENTENCE_END_RE.split(" ".join(response.split())):
+        candidate = f"{summary} {sentence}".strip()
+        if estimate_tokens(candidate) > max_tokens:
+            break
+        summary = candidate
+    return summary or truncate_to_tokens(" ".join(response.split()), max_tokens)
+
+
+class ConversationMemory:
+    """
+    Bounded memory of the HerSpace Agent replies given so far.
+
+    The latest replies are kept in full and earlier ones as one-line
+    summaries. Each summary is computed once, when its reply is recorded, and
+    the rendered history never exceeds token_ceiling: the oldest summaries
+    are dropped first, then the recent replies are trimmed.
+    """
+
+    def __init__(self, token_ceiling=MEMORY_TOKEN_CEILING, recent_steps=RECENT_STEPS,
+                 summary_tokens=SUMMARY_TOKENS_PER_STEP):
+        self.token_ceiling = token_ceiling
+        self.recent_steps = recent_steps
+        self.summary_tokens = summary_tokens
+        self._steps = OrderedDict()  # step -> (response, summary), oldest first
+
+    def record(self, step, response):
+        """Add or replace the reply for a step; it becomes the most recent one."""
+        self._steps.pop(step, None)
+        self._steps[step] = (response, summarize_response(response, self.summary_tokens))
+
+    def __len__(self):
+        return len(self._steps)
+
+    def render(self, header):
+        """The remembered history as prompt text, or "" if nothing was recorded."""
+        if not self._steps:
+            return ""
+
+        steps = list(self._steps.items())
+        split = max(0, len(steps) - self.recent_steps)
+        older = [f"Step '{step}' (summary): {summary}" for step, (_, summary) in steps[:split]]
+        recent = [(step, response) for step, (response, _) in steps[split:]]
+
+        budget = self.token_ceiling - estimate_tokens(header)
+        recent_lines = [f"Step '{step}': {response}" for step, response in recent]
+        recent_tokens = sum(estimate_tokens(line) for line in recent_lines)
+
+        if recent_tokens > budget:
+            # Even the recent replies don't fit: share the budget between them
+            per_step = max(0, budget // len(recent)) if recent else 0
+            recent_lines = [truncate_to_tokens(line, per_step) for line in recent_lines]
+            older = []
+        else:
+            # Roll the oldest summaries off until everything fits
+            older_tokens = [estimate_tokens(line) for line in older]
+            while older and recent_tokens + sum(older_tokens) > budget:
+                older.pop(0)
+                older_tokens.pop(0)
+
+        lines = [line for line in older + recent_lines if line]
+        if not lines:
+            return ""
+        return "\n" + header + "\n" + "\n".join(lines) + "\n"
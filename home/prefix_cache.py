@@ -0,0 +1,155 @@
+import datetime
+import hashlib
+import os
+import threading
+import time
+
+from home.gemini_client import get_clients, get_model, key_fingerprint
+
+
+# Opt-in: serve the static prompt prefix from Gemini's context cache
+PREFIX_CACHE_ENABLED = os.environ.get("HERSPACE_PREFIX_CACHE", "0") == "1"
+# Context caching needs a versioned model that supports it (gemini-pro doesn't)
+PREFIX_CACHE_MODEL = os.environ.get("HERSPACE_PREFIX_CACHE_MODEL", "models/gemini-1.5-flash-002")
+PREFIX_CACHE_TTL_SECONDS = int(os.environ.get("HERSPACE_PREFIX_CACHE_TTL", "3600"))
+# Extend a cached prefix's TTL once less than this much of it is left
+REFRESH_MARGIN_SECONDS = 300
+# After a failed upload, send full prompts for this key for a while before retrying
+FAILURE_COOLDOWN_SECONDS = 600
+
+
+class GeminiCacheBackend:
+    """Uploads prefixes with Gemini's cached-content API through the key's shared client."""
+
+    def create(self, api_key, model_name, prefix, ttl_seconds):
+        """Upload prefix; returns (cached content name, expiry as epoch seconds)."""
+        from google.ai import generativelanguage as glm
+
+        cached = get_clients(api_key).cache.create_cached_content(
+            cached_content=glm.CachedContent(
+                model=model_name,
+                display_name="herspace-prompt-prefix",
+                system_instruction=glm.Content(parts=[glm.Part(text=prefix)]),
+                ttl=datetime.timedelta(seconds=ttl_seconds)
+            )
+        )
+        return cached.name, cached.expire_time.timestamp()
+
+    def refresh(self, api_key, name, ttl_seconds):
+        """Extend an existing cached content; returns its new expiry as epoch seconds."""
+        from google.ai import generativelanguage as glm
+        from google.protobuf import field_mask_pb2
+
+        cached = get_clients(api_key).cache.update_cached_content(
+            cached_content=glm.CachedContent(name=name, ttl=datetime.timedelta(seconds=ttl_seconds)),
+            update_mask=field_mask_pb2.FieldMask(paths=["ttl"])
+        )
+        return cached.expire_time.timestamp()
+
+
+class PrefixCache:
+    """
+    Tracks which prompt prefixes are already uploaded for each API key.
+
+    lookup() returns the cached-content name for a prefix, uploading it on
+    first use and extending its TTL shortly before it expires. Any backend
+    failure returns None so the caller sends the full prompt instead; Gemini
+    rejects prefixes below a model-specific minimum size, so this fallback is
+    an expected path, not only an error path. The backend and clock are
+    injectable so the cache can be exercised against a local fake.
+    """
+
+    def __init__(self, backend=None, ttl_seconds=PREFIX_CACHE_TTL_SECONDS,
+                 refresh_margin=REFRESH_MARGIN_SECONDS, failure_cooldown=FAILURE_COOLDOWN_SECONDS,
+                 clock=time.time):
+        self.backend = backend or GeminiCacheBackend()
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = refresh_margin
+        self.failure_cooldown = failure_cooldown
+        self.clock = clock
+        self.stats = {"hits": 0, "uploads": 0, "refreshes": 0, "fallbacks": 0}
+        self._entries = {}  # (key fingerprint, model, prefix hash) -> [name, expires_at]
+        self._disabled_until = {}  # (key fingerprint, model) -> epoch seconds
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, api_key, model_name, prefix):
+        fingerprint = key_fingerprint(api_key)
+        entry_key = (fingerprint, model_name, hashlib.sha256(prefix.encode("utf-8")).hexdigest())
+        with self._lock:
+            lock = self._locks.setdefault(entry_key, threading.Lock())
+
+        # One upload per prefix and key even when many sessions ask at once
+        with lock:
+            now = self.clock()
+            if self._disabled_until.get((fingerprint, model_name), 0) > now:
+                self.stats["fallbacks"] += 1
+                return None
+
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[1] - now > self.refresh_margin:
+                self.stats["hits"] += 1
+                return entry[0]
+
+            if entry is not None and entry[1] > now:
+                try:
+                    entry[1] = self.backend.refresh(api_key, entry[0], self.ttl_seconds)
+                    self.stats["refreshes"] += 1
+                    return entry[0]
+                except Exception as e:
+                    # It may have been deleted server-side; upload it again below
+                    print(f"Prefix cache refresh failed: {e}")
+
+            try:
+                name, expires_at = self.backend.create(api_key, model_name, prefix, self.ttl_seconds)
+            except Exception as e:
+                print(f"Prefix cache unavailable, sending full prompts: {e}")
+                self._entries.pop(entry_key, None)
+                self._disabled_until[(fingerprint, model_name)] = now + self.failure_cooldown
+                self.stats["fallbacks"] += 1
+                return None
+
+            self._entries[entry_key] = [name, expires_at]
+            self.stats["uploads"] += 1
+            return name
+
+    def invalidate(self, api_key, model_name, prefix):
+        """Forget a prefix, e.g. after Gemini reports its cached content missing."""
+        entry_key = (key_fingerprint(api_key), model_name, hashlib.sha256(prefix.encode("utf-8")).hexdigest())
+        with self._lock:
+            self._entries.pop(entry_key, None)
+
+
+prefix_cache = PrefixCache()
+
+
+def is_cached_content_error(error):
+    """Whether Gemini rejected a request because its cached content is gone or unusable."""
+    from google.api_core import exceptions as google_exceptions
+
+    return isinstance(error, (google_exceptions.NotFound, google_exceptions.FailedPrecondition))
+
+
+def prefixed_model(api_key, prefix, suffix, use_cache=True):
+    """
+    The model and prompt to send for a static prefix plus a dynamic suffix.
+
+    With prefix caching on and the prefix cached, returns a model bound to the
+    cached content and only the suffix; otherwise the whole prompt, on
+    PREFIX_CACHE_MODEL when caching is on (so falling back never switches
+    models) and on the default model when it is off.
+
+    Returns:
+        tuple: (model, prompt, whether the model uses the cached prefix)
+    """
+    if not PREFIX_CACHE_ENABLED:
+        return get_model(api_key), prefix + suffix, False
+    if use_cache:
+        cached_content = prefix_cache.lookup(api_key, PREFIX_CACHE_MODEL, prefix)
+        if cached_content:
+            return get_clients(api_key).cached_model(cached_content, PREFIX_CACHE_MODEL), suffix, True
+    return get_model(api_key, PREFIX_CACHE_MODEL), prefix + suffix, False
+
+
+def drop_cached_prefix(api_key, prefix):
+    prefix_cache.invalidate(api_key, PREFIX_CACHE_MODEL, prefix)
@@ -1,12 +1,10 @@
-from resource_page.safe_hub import crisis_support_resources
+from resource_page.crisis_resources import crisis_resources_for_prompt
 
-def build_empowerment_prompt(category, situation, thoughts, emotions, emotion_intensity, 
-                           support_system, strengths, goal, extra_notes, previous_responses):
-    """
-    Build prompt from the empowerment inputs dictionary
-    """
-    
-    prompt = f'''
+# The part of the empowerment prompt that is the same for every user: persona,
+# UN SDG 5 targets and response-format instructions. Kept first so it can be
+# served from Gemini's context cache (see home/prefix_cache.py). The crisis
+# resources depend on the user's topic, so they go in the suffix.
+EMPOWERMENT_PROMPT_PREFIX = '''
         Persona - 'You are an empathetic, knowledgeable, and experienced counselor, social activist, lawyer, life coach, and career advisor with expertise in Positive Pyschology, laws, women's rights,
         and personal empowerment. Your mission is to guide women through a wide range of life challenges, empowering them to feel confident, supported, and equipped to make positive changes in their lives. 
         Your approach combines warmth, professional insight, and practical guidance. 
@@ -37,23 +35,9 @@ def build_empowerment_prompt(category, situation, thoughts, emotions, emotion_in
         Encourage her to explore the Crisis Support Resources and Therapy Location Finder pages on the HerSpace website. 
         '
 
-        Context:
-        - Category: {category}
-        - Situation: {situation}
-        - Current Thoughts: {thoughts}
-        - Emotional State: {emotions} (Intensity: {emotion_intensity})
-        - Available Support: {support_system}
-        - Personal Strengths: {strengths}
-        - Goal: {goal}
-        - Additional Notes: {extra_notes}
-
-        The following is the information on the Crisis Support Resources page on this site:
-        {crisis_support_resources}
+        The Crisis Support Resources relevant to the user's topic, taken from the Crisis Support Resources page on this site, are listed after the user's context below.
         
         
-        {previous_responses}
-        Consider these previous interactions and refine helpful responses when providing your final response to ensure continuity and progression in the support journey.
-
         With the insights from the Crisis Support Resources page and our previous conversations in mind, create a response that integrates personalized support to offer a structured and impactful pathway forward. Focus on:
         - Deepening Personalization: Reflect on the unique needs and challenges identified in past discussions, tailoring your response to address these specific aspects directly. Show understanding and empathy for the individual’s journey, providing insights that resonate with their personal experience.
         - Fostering Continuity: Ensure each response feels like a natural progression from earlier conversations, building on established themes or suggestions. This fosters a sense of growth and reliability, reinforcing the ongoing support and the individual’s progress.
@@ -115,4 +99,40 @@ def build_empowerment_prompt(category, situation, thoughts, emotions, emotion_in
         End with an encouraging statement that reinforces capability and hope.
     '''
 
-    return prompt
\ No newline at end of file
+
+def build_empowerment_suffix(category, situation, thoughts, emotions, emotion_intensity,
+                             support_system, strengths, goal, extra_notes, previous_responses):
+    """
+    Build the user-specific part of the empowerment prompt
+    """
+
+    return f'''
+        Context:
+        - Category: {category}
+        - Situation: {situation}
+        - Current Thoughts: {thoughts}
+        - Emotional State: {emotions} (Intensity: {emotion_intensity})
+        - Available Support: {support_system}
+        - Personal Strengths: {strengths}
+        - Goal: {goal}
+        - Additional Notes: {extra_notes}
+
+        {crisis_resources_for_prompt(category)}
+
+        {previous_responses}
+        Consider these previous interactions and refine helpful responses when providing your final response to ensure continuity and progression in the support journey.
+
+        Now write the response for this user, using the exact section markers described above.
+    '''
+
+
+def build_empowerment_prompt(category, situation, thoughts, emotions, emotion_intensity, 
+                           support_system, strengths, goal, extra_notes, previous_responses):
+    """
+    Build prompt from the empowerment inputs dictionary
+    """
+
+    return EMPOWERMENT_PROMPT_PREFIX + build_empowerment_suffix(
+        category, situation, thoughts, emotions, emotion_intensity,
+        support_system, strengths, goal, extra_notes, previous_responses
+    )
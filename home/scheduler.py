@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+
+# Most Gemini calls allowed in flight at once across the whole process
+MAX_CONCURRENCY = int(os.environ.get("HERSPACE_GEMINI_CONCURRENCY", "8"))
+# Most calls allowed to wait for a slot before new ones are turned away
+MAX_QUEUE_DEPTH = int(os.environ.get("HERSPACE_GEMINI_QUEUE_DEPTH", "100"))
+# Longest a caller waits for a slot before giving up
+MAX_WAIT_SECONDS = float(os.environ.get("HERSPACE_GEMINI_MAX_WAIT", "60"))
+
+
+class SchedulerBusy(Exception):
+    """Raised when a call can't be admitted: the queue is full or the wait timed out."""
+
+
+class Ticket:
+    """A caller's place in the scheduler; granted once it may start its call."""
+
+    def __init__(self, scheduler, key):
+        self.key = key
+        self.enqueued_at = time.monotonic()
+        self._scheduler = scheduler
+        self._granted = threading.Event()
+        self._done = False
+
+    @property
+    def granted(self):
+        return self._granted.is_set()
+
+    def position(self):
+        """1-based place in line, or 0 once the call may run."""
+        return self._scheduler.position(self)
+
+    def wait(self, timeout=None):
+        return self._granted.wait(timeout)
+
+    def release(self):
+        """Give the slot back, or leave the queue if it was never granted."""
+        self._scheduler.release(self)
+
+
+class GeminiScheduler:
+    """
+    Process-wide admission control for Gemini calls.
+
+    At most `max_concurrency` calls run at once. Waiting calls are queued per
+    key (an API key fingerprint) and slots are handed out round-robin across
+    keys, so one busy key can't starve the others.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, max_queue_depth=MAX_QUEUE_DEPTH):
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self._queues = OrderedDict()  # key -> deque of waiting tickets, in serving order
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "admitted": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "peak_queue_depth": 0,
+            "total_wait_seconds": 0.0,
+        }
+
+    def submit(self, key):
+        """Queue a call for `key` and return its Ticket; raises SchedulerBusy when full."""
+        ticket = Ticket(self, key)
+        with self._lock:
+            depth = self._queue_depth()
+            if depth >= self.max_queue_depth:
+                self._stats["rejected"] += 1
+                raise SchedulerBusy("Too many requests are waiting for the AI service.")
+            self._queues.setdefault(key, deque()).append(ticket)
+            self._stats["peak_queue_depth"] = max(self._stats["peak_queue_depth"], depth + 1)
+            self._dispatch()
+        return ticket
+
+    def release(self, ticket):
+        with self._lock:
+            if ticket._done:
+                return
+            ticket._done = True
+            if ticket.granted:
+                self._in_flight -= 1
+            else:
+                queue = self._queues.get(ticket.key)
+                if queue is not None and ticket in queue:
+                    queue.remove(ticket)
+                    if not queue:
+                        del self._queues[ticket.key]
+            self._dispatch()
+
+    def position(self, ticket):
+        with self._lock:
+            if ticket.granted or ticket._done:
+                return 0
+            queue = self._queues.get(ticket.key)
+            if queue is None or ticket not in queue:
+                return 0
+            index = queue.index(ticket)
+            ahead = index
+            # Keys earlier in the rotation get one more turn than later ones before ours
+            before_us = True
+            for key, other in self._queues.items():
+                if key == ticket.key:
+                    before_us = False
+                    continue
+                ahead += min(len(other), index + 1 if before_us else index)
+            return ahead + 1
+
+    def metrics(self):
+        """Snapshot of queue depth and admission counters."""
+        with self._lock:
+            admitted = self._stats["admitted"]
+            return {
+                "in_flight": self._in_flight,
+                "queue_depth": self._queue_depth(),
+                "queued_keys": len(self._queues),
+                "max_concurrency": self.max_concurrency,
+                "avg_wait_seconds": self._stats["total_wait_seconds"] / admitted if admitted else 0.0,
+                **self._stats,
+            }
+
+    @contextmanager
+    def turn(self, key, on_wait=None, poll_seconds=0.5, max_wait=MAX_WAIT_SECONDS):
+        """
+        Hold a slot for the duration of the block.
+
+        Args:
+            key: Fairness key, e.g. the API key fingerprint
+            on_wait: Optional callback receiving the queue position while waiting,
+                and 0 once the call is admitted after having waited
+            poll_seconds: How often on_wait is called
+            max_wait: Seconds to wait before raising SchedulerBusy
+        """
+        ticket = self.submit(key)
+        try:
+            deadline = time.monotonic() + max_wait
+            waited = False
+            while not ticket.wait(poll_seconds):
+                if time.monotonic() >= deadline:
+                    with self._lock:
+                        self._stats["timed_out"] += 1
+                    raise SchedulerBusy("Timed out waiting for the AI service.")
+                if on_wait is not None:
+                    waited = True
+                    on_wait(ticket.position())
+            if waited:
+                on_wait(0)
+            yield ticket
+        finally:
+            ticket.release()
+
+    def _queue_depth(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _dispatch(self):
+        # Caller holds self._lock
+        while self._in_flight < self.max_concurrency and self._queues:
+            key, queue = next(iter(self._queues.items()))
+            ticket = queue.popleft()
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            self._in_flight += 1
+            self._stats["admitted"] += 1
+            self._stats["total_wait_seconds"] += time.monotonic() - ticket.enqueued_at
+            ticket._granted.set()
+
+
+scheduler = GeminiScheduler()
@@ -0,0 +1,122 @@
+import re
+
+
+# Response sections and the markers the model wraps them in
+SECTION_MARKERS = {
+    "validation": ("[VALIDATION_START]", "[VALIDATION_END]"),
+    "insights": ("[INSIGHTS_START]", "[INSIGHTS_END]"),
+    "milestones": ("[MILESTONES_START]", "[MILESTONES_END]"),
+    "actions": ("[ACTIONS_START]", "[ACTIONS_END]"),
+    "support": ("[SUPPORT_START]", "[SUPPORT_END]"),
+    "growth_overview": ("[GROWTH_START]", "[GROWTH_END]")
+}
+
+
+def clean_section_text(content):
+    content = content.strip()
+    # 将星号标记转换为圆点
+    content = content.replace("* ", "• ")
+    # 移除空行
+    return "\n".join(line.strip() for line in content.split("\n") if line.strip())
+
+
+class SectionStreamParser:
+    """
+    Incremental parser for [X_START]...[X_END] sectioned model output.
+
+    Chunks are fed in as they arrive and each section is reported once, the
+    moment its END marker is seen. A section left open when another one
+    starts is dropped, as the old extract_section did. Every character is
+    scanned once; outside a section only a marker-sized tail is buffered, so
+    a marker split across two chunks is still recognised.
+
+    Usage:
+        parser = SectionStreamParser()
+        for chunk in chunks:
+            for section, text in parser.feed(chunk):
+                ...
+        for section, text in parser.close():
+            ...
+    """
+
+    def __init__(self, markers=None):
+        markers = markers or SECTION_MARKERS
+        self._starts = {start: (section, end) for section, (start, end) in markers.items()}
+        # Longest first so a marker that prefixes another can't shadow it
+        self._start_re = re.compile("|".join(
+            re.escape(start) for start in sorted(self._starts, key=len, reverse=True)
+        ))
+        self._start_tail = max(len(start) for start in self._starts) - 1
+        self._sections = list(markers)
+        self._buffer = ""
+        self._scan_from = 0
+        self._current = None  # (section, end_marker) while inside a section
+        self._emitted = set()
+
+    @property
+    def pending(self):
+        """Sections that have not been reported yet."""
+        return [section for section in self._sections if section not in self._emitted]
+
+    def feed(self, chunk):
+        """
+        Consume a chunk of model output.
+
+        Returns:
+            list: (section, text) pairs for every section completed by this chunk
+        """
+        events = []
+        self._buffer += chunk
+        while True:
+            if self._current is None:
+                match = self._start_re.search(self._buffer, self._scan_from)
+                if match is None:
+                    # Only a partial start marker can matter from here on
+                    if len(self._buffer) > self._start_tail:
+                        self._buffer = self._buffer[len(self._buffer) - self._start_tail:]
+                    self._scan_from = 0
+                    return events
+                self._current = self._starts[match.group()]
+                self._buffer = self._buffer[match.end():]
+                self._scan_from = 0
+            else:
+                section, end_marker = self._current
+                end_idx = self._buffer.find(end_marker, self._scan_from)
+                # A section whose END never came is abandoned when the next one starts
+                restart = self._start_re.search(self._buffer, self._scan_from,
+                                                len(self._buffer) if end_idx == -1 else end_idx)
+                if restart is not None:
+                    self._current = self._starts[restart.group()]
+                    self._buffer = self._buffer[restart.end():]
+                    self._scan_from = 0
+                    continue
+                if end_idx == -1:
+                    # Re-check only the tail that could hold the start of a split marker
+                    self._scan_from = max(0, len(self._buffer) - max(len(end_marker) - 1, self._start_tail))
+                    return events
+                # Like the old extract_section, a repeated section keeps its first text
+                if section not in self._emitted:
+                    self._emitted.add(section)
+                    events.append((section, clean_section_text(self._buffer[:end_idx])))
+                self._current = None
+                self._buffer = self._buffer[end_idx + len(end_marker):]
+                self._scan_from = 0
+
+    def close(self):
+        """
+        Finish the stream.
+
+        Returns:
+            list: (section, "") pairs for sections that never completed
+        """
+        events = [(section, "") for section in self.pending]
+        self._emitted.update(self._sections)
+        self._buffer = ""
+        self._current = None
+        return events
+
+
+def parse_sections(text):
+    """Parse a complete response into a {section: text} dict."""
+    parser = SectionStreamParser()
+    return dict(parser.feed(text) + parser.close())
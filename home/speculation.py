@@ -0,0 +1,132 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from home.gemini_client import key_fingerprint
+from home.generation import stream_final_sections
+
+
+# Opt-in: start the final response while the user is still reading the summary
+SPECULATIVE_GENERATION = os.environ.get("HERSPACE_SPECULATIVE_GENERATION", "0") == "1"
+# Background threads for speculative work; Gemini concurrency is still capped by the scheduler
+SPECULATIVE_WORKERS = int(os.environ.get("HERSPACE_SPECULATIVE_WORKERS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=SPECULATIVE_WORKERS, thread_name_prefix="herspace-speculative")
+
+
+def speculation_key(api_key, prompt_suffix):
+    """Hash of the form data as it appears in the prompt, plus the key it runs under."""
+    return hashlib.sha256((key_fingerprint(api_key) + prompt_suffix).encode("utf-8")).hexdigest()
+
+
+class SpeculationCancelled(Exception):
+    """Raised inside a worker to abandon a job that is no longer wanted."""
+
+
+class SpeculativeJob:
+    """
+    A final response generated on a background worker.
+
+    Sections are collected as they stream in, so the response step can show
+    whatever is already finished and follow the rest live.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.queue_position = 0
+        self.error = None
+        self._events = []
+        self._done = False
+        self._cancelled = threading.Event()
+        self._condition = threading.Condition()
+
+    @property
+    def done(self):
+        return self._done
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Throw the work away; a running stream stops at its next chunk."""
+        self._cancelled.set()
+
+    def events(self, poll_seconds=0.5, on_wait=None, on_poll=None):
+        """
+        Yield the job's (section, text) pairs, waiting for ones still in flight.
+
+        Args:
+            on_wait: Optional callback receiving the queue position while the
+                job hasn't started yet, like GeminiScheduler.turn's on_wait
+            on_poll: Optional callback run each time the wait wakes up, at
+                least every poll_seconds
+
+        Raises:
+            The job's error, if it failed
+        """
+        seen = 0
+        waited = False
+        while True:
+            with self._condition:
+                if seen == len(self._events) and not self._done:
+                    self._condition.wait(poll_seconds)
+                new_events = self._events[seen:]
+                done = self._done
+            seen += len(new_events)
+
+            if on_poll is not None:
+                on_poll()
+            if on_wait is not None:
+                if self.queue_position:
+                    waited = True
+                    on_wait(self.queue_position)
+                elif waited:
+                    waited = False
+                    on_wait(0)
+
+            yield from new_events
+            if done and seen == len(self._events):
+                break
+
+        if self.error is not None:
+            raise self.error
+
+    def _run(self, api_key, prompt_suffix):
+        sections = stream_final_sections(api_key, prompt_suffix, on_wait=self._set_queue_position,
+                                         should_stop=lambda: self.cancelled)
+        try:
+            if self.cancelled:
+                # Cancelled while waiting for a worker; don't send the request at all
+                return
+            for event in sections:
+                if self.cancelled:
+                    break
+                with self._condition:
+                    self._events.append(event)
+                    self._condition.notify_all()
+        except SpeculationCancelled:
+            pass
+        except Exception as e:
+            print(f"Speculative generation failed: {e}")
+            self.error = e
+        finally:
+            # Closing the stream releases its scheduler slot right away
+            sections.close()
+            with self._condition:
+                self._done = True
+                self._condition.notify_all()
+
+    def _set_queue_position(self, position):
+        if self.cancelled:
+            # Leave the scheduler queue instead of waiting for a slot nobody needs
+            raise SpeculationCancelled()
+        self.queue_position = position
+
+
+def start_speculative_job(api_key, prompt_suffix):
+    """Start generating the final response for prompt_suffix in the background."""
+    job = SpeculativeJob(speculation_key(api_key, prompt_suffix))
+    _executor.submit(job._run, api_key, prompt_suffix)
+    return job
@@ -1,11 +1,17 @@
 import streamlit as st
-from home.prompts import build_empowerment_prompt
-import google.generativeai as genai
-import base64
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from resource_page.safe_hub import crisis_support_resources
+from home.generation import build_final_prompt_suffix, chunk_texts, generate_final_sections, stream_final_sections
+from home.memory import ConversationMemory
+from home.gemini_client import get_model, key_fingerprint
+from home.scheduler import scheduler, SchedulerBusy
+from home.speculation import SPECULATIVE_GENERATION, speculation_key, start_speculative_job
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from home.youtube import VIDEO_TIMEOUT_SECONDS, fetch_recommended_videos
+from home.categories import CATEGORY_OPTIONS, CATEGORY_PLACEHOLDER, OTHER_CATEGORY
+from resource_page.crisis_resources import crisis_resources_for_prompt
 from home.utils import get_api_key
+from home.assets import ASSET_SOURCES, asset_path, asset_url, image_url
 
 
 # At the top of steps.py, make sure all functions are listed in __all__
@@ -79,28 +85,15 @@ def render_welcome_step():
     st.divider()
 
     # Define options list
-    category_options = [
-        "Select an topic...",
-        "Women in Leadership & Glass Ceiling",
-        "Gender Inequality in Education",
-        "Workplace Gender Discrimination",
-        "Pregnancy & Parenting Challenges",
-        "Domestic Violence",
-        "Work-Life Balance Struggles",
-        "Body Image & Beauty Standards",
-        "Online Harassment & Cyberstalking",
-        "Offline Harassment",
-        "Unhealthy Relationships",
-        "Other (please specify)"
-    ]
+    category_options = CATEGORY_OPTIONS
     # Get the current category from session state
-    current_category = st.session_state.form_data.get("category", "Select an topic...")
+    current_category = st.session_state.form_data.get("category", CATEGORY_PLACEHOLDER)
 
     # Check if the current category exists in category_options
     if current_category in category_options:
         index = category_options.index(current_category)
     else:
-        index = category_options.index("Other (please specify)")
+        index = category_options.index(OTHER_CATEGORY)
 
     # Get user input with previous value
     concern_category = st.selectbox(
@@ -111,9 +104,9 @@ def render_welcome_step():
 
     # Show situation input if category is selected
     proceed_to_next = False
-    if concern_category != "Select an topic...":
+    if concern_category != CATEGORY_PLACEHOLDER:
         # Check if the user selected "Other (please specify)"
-        if concern_category == "Other (please specify)":
+        if concern_category == OTHER_CATEGORY:
             # Check if a custom category has already been entered
             if "custom_category" not in st.session_state:
                 st.session_state.custom_category = ""  # Initialize if not present
@@ -690,10 +683,16 @@ def render_summary_step():
     st.write("")
     st.write("")
     
+    # Get a head start on the personalized support while the summary is read
+    if SPECULATIVE_GENERATION:
+        start_speculation(st.session_state.form_data)
+
     # Final submit button
     col1, spacer1, spacer2, col3 = st.columns([1, 2, 2, 3])
     with col1:
         if st.button("Back", key="summary_back", help="Return to previous step"):
+            # The form may be edited, so any speculative response is stale
+            discard_speculative_job()
             st.session_state.current_step = 7  # Go back to final step
             st.rerun()
     with col3:
@@ -715,23 +714,21 @@ def render_response_step():
     st.empty()
     placeholder = st.container()
     
-    def get_base64_gif(gif_path):
-        with open(gif_path, "rb") as file:
-            return base64.b64encode(file.read()).decode()
-    
+    # Start the video lookup first so it runs in parallel with the Gemini call
+    start_video_lookup(st.session_state.form_data)
+
     with placeholder:
         st.markdown('<p class="section-title">💫 Your Personalized Support</p>', unsafe_allow_html=True)
         
         # Only generate AI response if it hasn't been generated yet
-        if "ai_response" not in st.session_state:
+        generating = "ai_response" not in st.session_state
+        if generating:
             col1, col2 = st.columns([1, 3])
             
             with col1:
-                gif_path = "static/gif/bird.gif"
-                gif_base64 = get_base64_gif(gif_path)
                 st.markdown(f"""
                     <div style="display: flex; justify-content: center;">
-                        <img src="data:image/gif;base64,{gif_base64}" width="150px">
+                        <img src="{asset_url(asset_path('bird'))}" width="150px">
                     </div>
                     """, 
                     unsafe_allow_html=True
@@ -743,240 +740,280 @@ def render_response_step():
                     Thank you for sharing your journey with us. By reflecting on your experiences and seeking support, you've shown great courage and self-awareness. 
                     Remember, every step forward, no matter how small, is progress. You have the strength within you to create positive change.
                 """)
-        
 
+        # Shows the user's place in line if Gemini calls are queued
+        queue_status = st.empty()
+        tabs = st.tabs([label for _, label, _, _ in RESPONSE_TABS] + ["🎬 Helpful Youtube Videos"])
+        tab7 = tabs[-1]
+
+        # One placeholder per section tab so streamed sections can be filled in as they arrive
+        section_boxes = {}
+        for tab, (section, _, _, _) in zip(tabs, RESPONSE_TABS):
+            with tab:
+                section_boxes[section] = st.empty()
+
+        # Videos are rendered as soon as their lookup finishes, even mid-stream
+        with tab7:
+            videos_box = st.empty()
+        videos_shown = show_videos_when_ready(videos_box)
+
+        def poll_videos():
+            nonlocal videos_shown
+            if not videos_shown:
+                videos_shown = show_videos_when_ready(videos_box)
+
+        if generating:
+            for box in section_boxes.values():
+                box.caption("✍️ Still writing this part of your response...")
             with st.spinner("Generating your personalized support message..."):
-                st.session_state.ai_response = generate_ai_response(st.session_state.form_data)
-        
-        if "ai_response" in st.session_state:
-            tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-                "🤗 Validation",
-                "💡 Insights",
-                "🎯 Milestones",
-                "✨ Actions",
-                "👥 Support",
-                "🌱 Growth",
-                "🎬 Helpful Youtube Videos"
-            ])
-            
-            # Validation Tab
-            with tab1:
-                st.markdown("""
-                    <div class="response-box validation">
-                        <h4>Understanding Your Experience</h4>
-                        <p>{}</p>
-                    </div>
-                """.format(st.session_state.ai_response.get("validation", "")), unsafe_allow_html=True)
-            
-            # Insights Tab
-            with tab2:
-                st.markdown("""
-                    <div class="response-box insights">
-                        <h4>Key Insights & Reflections</h4>
-                        <p>{}</p>
-                    </div>
-                """.format(st.session_state.ai_response.get("insights", "")), unsafe_allow_html=True)
-            
-            # Milestones Tab
-            with tab3:
-                st.markdown("""
-                    <div class="response-box milestones">
-                        <h4>Your Strengths & Progress</h4>
-                        <p>{}</p>
-                    </div>
-                """.format(st.session_state.ai_response.get("milestones", "")), unsafe_allow_html=True)
-            
-            # Actions Tab
-            with tab4:
-                st.markdown("""
-                    <div class="response-box actions">
-                        <h4>Practical Next Steps</h4>
-                        <p>{}</p>
-                    </div>
-                """.format(st.session_state.ai_response.get("actions", "")), unsafe_allow_html=True)
-            
-            # Support Tab
-            with tab5:
-                st.markdown("""
-                    <div class="response-box support">
-                        <h4>Support Network & Resources</h4>
-                        <p>{}</p>
-                    </div>
-                """.format(st.session_state.ai_response.get("support", "")), unsafe_allow_html=True)
-            
-            # Growth Tab
-            with tab6:
-                st.markdown("""
-                    <div class="response-box growth">
-                        <h4>Growth & Development</h4>
-                        <p>{}</p>
-                    </div>
-                """.format(st.session_state.ai_response.get("growth_overview", "")), unsafe_allow_html=True)
-
-            # Videos Tab
-            with tab7:
-                if "youtube_videos" not in st.session_state:
-                    # Generate search query based on the situation and category
-                    search_query = f"deal with {st.session_state.form_data['category']} problems"
-                    print(search_query)
-                    
-                    # Search for videos
-                    videos = search_youtube_videos(
-                        query=search_query,
-                        api_key=st.secrets["GOOGLE_API_KEY"],
-                        max_results=5
-                    )
-                    
-                    st.session_state.youtube_videos = videos
-                
+                ai_response = stream_response_tabs(st.session_state.form_data, section_boxes, queue_status, on_progress=poll_videos)
+            if ai_response is not None:
+                st.session_state.ai_response = ai_response
+        else:
+            for section, box in section_boxes.items():
+                box.markdown(render_section_box(section, st.session_state.ai_response.get(section, "")), unsafe_allow_html=True)
+
+        if not videos_shown and not show_videos_when_ready(videos_box, wait=True):
+            videos_box.info("🎬 Videos are taking longer than usual to load. They'll appear here when you next interact with the page.")
+
+def start_video_lookup(form_data):
+    """Start looking up videos in the background, unless already done or underway."""
+    if "youtube_videos" in st.session_state or "youtube_videos_future" in st.session_state:
+        return
+    st.session_state.youtube_videos_future = fetch_recommended_videos(
+        form_data['category'],
+        api_key=st.secrets["GOOGLE_API_KEY"]
+    )
+    st.session_state.youtube_videos_deadline = time.monotonic() + VIDEO_TIMEOUT_SECONDS
+
+def show_videos_when_ready(videos_box, wait=False):
+    """
+    Render the videos tab into videos_box once the lookup has finished.
+
+    Args:
+        wait: Block until the lookup's deadline instead of only checking
+
+    Returns:
+        bool: Whether the videos were rendered
+    """
+    if "youtube_videos" not in st.session_state:
+        future = st.session_state.get("youtube_videos_future")
+        if future is None:
+            return False
+        timeout = max(0, st.session_state.youtube_videos_deadline - time.monotonic()) if wait else 0
+        try:
+            videos = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return False
+        except Exception as error:
+            print(f"Error loading videos: {error}")
+            videos = []
+        st.session_state.youtube_videos = videos
+        del st.session_state.youtube_videos_future
+
+    with videos_box.container():
+        st.markdown("""
+            <div class="response-box videos">
+                <h4>Recommended Videos</h4>
+                <p>Here are some helpful videos related to your situation:</p>
+            </div>
+        """, unsafe_allow_html=True)
+
+        # Display videos
+        for video in st.session_state.youtube_videos:
+            col1, col2 = st.columns([1, 2])
+            with col1:
+                st.image(video['thumbnail'], use_container_width=True)
+            with col2:
+                st.markdown(f"#### {video['title']}")
+                st.markdown(video['description'][:200] + "..." if len(video['description']) > 200 else video['description'])
                 st.markdown("""
-                    <div class="response-box videos">
-                        <h4>Recommended Videos</h4>
-                        <p>Here are some helpful videos related to your situation:</p>
-                    </div>
-                """, unsafe_allow_html=True)
-
-                # Display videos
-                for video in st.session_state.youtube_videos:
-                    col1, col2 = st.columns([1, 2])
-                    with col1:
-                        st.image(video['thumbnail'], use_container_width=True)
-                    with col2:
-                        st.markdown(f"#### {video['title']}")
-                        st.markdown(video['description'][:200] + "..." if len(video['description']) > 200 else video['description'])
-                        st.markdown("""
-                                    <div>
-                                        <a href="https://www.youtube.com/watch?v={video['video_id']}" target="_blank" class="yellow-link">Watch Video</a>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                    st.divider()                
-def generate_ai_response(form_data):
+                            <div>
+                                <a href="https://www.youtube.com/watch?v={video['video_id']}" target="_blank" class="yellow-link">Watch Video</a>
+                            </div>
+                            """, unsafe_allow_html=True)
+            st.divider()
+    return True
+
+# Section tabs on the response page: (section, tab label, box css class, heading)
+RESPONSE_TABS = [
+    ("validation", "🤗 Validation", "validation", "Understanding Your Experience"),
+    ("insights", "💡 Insights", "insights", "Key Insights & Reflections"),
+    ("milestones", "🎯 Milestones", "milestones", "Your Strengths & Progress"),
+    ("actions", "✨ Actions", "actions", "Practical Next Steps"),
+    ("support", "👥 Support", "support", "Support Network & Resources"),
+    ("growth_overview", "🌱 Growth", "growth", "Growth & Development")
+]
+
+def render_section_box(section, text):
+    for tab_section, _, css_class, heading in RESPONSE_TABS:
+        if tab_section == section:
+            return """
+                <div class="response-box {}">
+                    <h4>{}</h4>
+                    <p>{}</p>
+                </div>
+            """.format(css_class, heading, text)
+    return ""
+
+def stream_response_tabs(form_data, section_boxes, status, on_progress=None):
+    """
+    Stream the personalized support response, filling each tab's placeholder
+    as soon as its section is complete.
+
+    Args:
+        status: Placeholder that shows the queue position while waiting for Gemini
+        on_progress: Optional callback run while waiting in the queue, after every
+            streamed chunk and after each section is rendered, so other
+            content can be shown the moment it's ready
+
+    Returns:
+        dict: The complete sections, or None if generation failed
+    """
+    job = take_speculative_job(form_data)
+    if job is not None:
+        # Reuse the response already generated (or generating) while the summary was shown
+        sections = job.events(on_wait=show_queue_position(status), on_poll=on_progress)
+    else:
+        sections = generate_ai_response(form_data, stream=True, status=status, on_progress=on_progress)
+    if sections is None:
+        return None
+
+    ai_response = {}
+    try:
+        for section, text in sections:
+            ai_response[section] = text
+            section_boxes[section].markdown(render_section_box(section, text), unsafe_allow_html=True)
+            if on_progress is not None:
+                on_progress()
+    except SchedulerBusy:
+        st.warning(BUSY_MESSAGE)
+        return None
+    except Exception as error:
+        st.error(f"Error generating response: {str(error)}")
+        print(f"Error details: {error}")
+        return None
+
+    return ai_response
+
+def generate_ai_response(form_data, stream=False, status=None, on_progress=None):
+    """
+    Generate the final personalized support response.
+
+    With stream=True a generator of (section, text) pairs is returned instead of
+    a dict; each pair is yielded as soon as the section's END marker arrives.
+    While waiting for a Gemini slot the queue position is shown in `status`.
+    on_progress is called while queued and after every streamed chunk.
+    """
     try:
         print("Generating AI response")
-        # Configure and use the LLM
         llm_api_key = st.session_state.get('gemini_api_key')
-        genai.configure(api_key=llm_api_key)
-        model = genai.GenerativeModel(model_name="gemini-pro")
-        
-        # Get previous responses if they exist
-        previous_responses = ""
-        if "step_responses" in st.session_state:
-            previous_responses = "\nPrevious step interactions:\n"
-            for step, response in st.session_state.step_responses.items():
-                previous_responses += f"Step '{step}': {response}\n"
-
-        # Build prompt with previous responses
-        prompt = build_empowerment_prompt(
-            category=form_data["category"],
-            situation=form_data["situation"],
-            thoughts=form_data["thoughts"],
-            emotions=form_data["primary_emotion"],
-            emotion_intensity=form_data["emotion_intensity"],
-            support_system=form_data["support_system"],
-            strengths=form_data["strengths"],
-            goal=form_data["goal"],
-            extra_notes=form_data["extra_notes"],
-            previous_responses=previous_responses  # Add previous responses
-        )
-        
-        # Generate response
-        response = model.generate_content(prompt)
-        
-        raw_text = response.candidates[0].content.parts[0].text
-        
-        sections = {
-            "validation": "",
-            "insights": "",
-            "milestones": "",
-            "actions": "",
-            "support": "",
-            "growth_overview": ""
-        }
-        
-        # 定义section标记对
-        section_markers = {
-            "validation": ("[VALIDATION_START]", "[VALIDATION_END]"),
-            "insights": ("[INSIGHTS_START]", "[INSIGHTS_END]"),
-            "milestones": ("[MILESTONES_START]", "[MILESTONES_END]"),
-            "actions": ("[ACTIONS_START]", "[ACTIONS_END]"),
-            "support": ("[SUPPORT_START]", "[SUPPORT_END]"),
-            "growth_overview": ("[GROWTH_START]", "[GROWTH_END]")
-        }
-        
-        def extract_section(text, start_marker, end_marker):
-            try:
-                start_idx = text.find(start_marker)
-                if start_idx == -1:
-                    return ""
-                
-                # 从开始标记后开始查找结束标记
-                content_start = start_idx + len(start_marker)
-                end_idx = text.find(end_marker, content_start)
-                
-                if end_idx == -1:
-                    return ""
-                
-                # 提取内容并清理
-                content = text[content_start:end_idx].strip()
-                # 将星号标记转换为圆点
-                content = content.replace("* ", "• ")
-                # 移除空行
-                content = "\n".join(line.strip() for line in content.split("\n") if line.strip())
-                
-                return content
-            except Exception as e:
-                print(f"Error extracting section: {e}")
-                return ""
-        
-        for section, (start_marker, end_marker) in section_markers.items():
-            sections[section] = extract_section(raw_text, start_marker, end_marker)
-        
-        return sections
+        prompt_suffix = final_prompt_suffix(form_data)
+        on_wait = show_queue_position(status or st.empty(), on_tick=on_progress)
+
+        if stream:
+            return stream_final_sections(llm_api_key, prompt_suffix, on_wait=on_wait, on_chunk=on_progress)
+
+        return generate_final_sections(llm_api_key, prompt_suffix, on_wait=on_wait)
         
+    except SchedulerBusy:
+        st.warning(BUSY_MESSAGE)
+        return None
     except Exception as error:
         st.error(f"Error generating response: {str(error)}")
         print(f"Error details: {error}")
         return None
-    
-def search_youtube_videos(query, api_key, max_results=5):
+
+def start_speculation(form_data):
     """
-    Search for YouTube videos related to the situation
+    Start generating the final response in the background while the summary is
+    read, replacing speculative work for form data that has since changed.
     """
+    llm_api_key = st.session_state.get('gemini_api_key')
+    if not llm_api_key:
+        return
     try:
-        youtube = build('youtube', 'v3', developerKey=api_key)
-        
-        # Call the search.list method to retrieve results matching the specified query term
-        search_response = youtube.search().list(
-            q=query,
-            part='id,snippet',
-            maxResults=max_results,
-            type='video',
-            relevanceLanguage='en',
-            safeSearch='strict'
-        ).execute()
-        
-        videos = []
-        for search_result in search_response.get('items', []):
-            if search_result['id']['kind'] == 'youtube#video':
-                videos.append({
-                    'title': search_result['snippet']['title'],
-                    'description': search_result['snippet']['description'],
-                    'video_id': search_result['id']['videoId'],
-                    'thumbnail': search_result['snippet']['thumbnails']['medium']['url']
-                })
-        
-        return videos
-    
-    except HttpError as e:
-        print(f'An HTTP error {e.resp.status} occurred: {e.content}')
-        return []
+        prompt_suffix = final_prompt_suffix(form_data)
+    except KeyError as error:
+        print(f"Debug: Not speculating, missing form data {error}")
+        return
+
+    job = st.session_state.get("speculative_job")
+    if job is not None and job.key == speculation_key(llm_api_key, prompt_suffix):
+        return
+    discard_speculative_job()
+    st.session_state.speculative_job = start_speculative_job(llm_api_key, prompt_suffix)
+
+def take_speculative_job(form_data):
+    """Hand over the speculative job if it was started for exactly this form data."""
+    job = st.session_state.pop("speculative_job", None)
+    if job is None:
+        return None
+    try:
+        key = speculation_key(st.session_state.get('gemini_api_key'), final_prompt_suffix(form_data))
+    except KeyError:
+        key = None
+    if job.key != key or (job.done and job.error is not None):
+        job.cancel()
+        return None
+    return job
+
+def discard_speculative_job():
+    job = st.session_state.pop("speculative_job", None)
+    if job is not None:
+        job.cancel()
+
+def final_prompt_suffix(form_data):
+    """The user-specific part of the final prompt, with a bounded summary of previous responses."""
+    previous_responses = get_conversation_memory().render("Previous step interactions:")
+    return build_final_prompt_suffix(form_data, previous_responses)
+
+BUSY_MESSAGE = "HerSpace is helping a lot of people right now. Please try again in a moment. 💗"
+
+def show_queue_position(status, on_tick=None):
+    """
+    Scheduler on_wait callback that shows the user's place in line in `status`,
+    then runs on_tick (if given).
+    """
+    def on_wait(position):
+        if position:
+            status.info(f"⏳ Many people are talking to HerSpace right now. You're number {position} in line...")
+        else:
+            status.empty()
+        if on_tick is not None:
+            on_tick()
+    return on_wait
+
+@contextmanager
+def gemini_turn(llm_api_key, status):
+    """
+    Hold a process-wide Gemini scheduler slot for the duration of the block,
+    showing the user's place in line in `status` while they wait.
+    """
+    with scheduler.turn(key_fingerprint(llm_api_key), on_wait=show_queue_position(status)):
+        yield
+
+def stream_in_turn(llm_api_key, status, start_stream):
+    """Yield from a streaming Gemini call while holding its scheduler slot until the stream ends."""
+    with gemini_turn(llm_api_key, status):
+        yield from start_stream()
     
-def generate_robot_response(form_data, extra_prompt: str = ""):
+# Fallback agent replies when Gemini returns nothing usable or fails
+ROBOT_FALLBACK_RESPONSE = "I'm here to support you! It's great that you've recognized this issue. Acknowledging your feelings is a significant step towards growth, and I'm here to help you through this journey."
+ROBOT_ERROR_RESPONSE = "I'm here to support you! Remember, every step you take is a step towards growth."
+
+def generate_robot_response(form_data, extra_prompt: str = "", stream: bool = False, status=None):
+    """
+    Generate the HerSpace Agent reply for the current step.
+
+    With stream=True an iterable of text pieces is returned instead of a str,
+    so the reply can be shown token by token. While waiting for a Gemini slot
+    the queue position is shown in `status`.
+    """
     try:
-        # Configure the Gemini API
+        # Use the shared Gemini client for this key
         llm_api_key = st.session_state.get('gemini_api_key')
-        genai.configure(api_key=llm_api_key)
-        model = genai.GenerativeModel(model_name="gemini-pro")
+        model = get_model(llm_api_key)
 
 
         # Extract values, defaulting to empty strings if not present
@@ -991,12 +1028,8 @@ def generate_robot_response(form_data, extra_prompt: str = ""):
         extra_notes = form_data.get("extra_notes", "")
 
 
-        # Get previous responses if they exist
-        previous_responses = ""
-        if "step_responses" in st.session_state:
-            previous_responses = "\nPrevious interactions with the user:\n"
-            for step, response in st.session_state.step_responses.items():
-                previous_responses += f"Step '{step}': {response}\n"
+        # Get a bounded summary of previous responses if they exist
+        previous_responses = get_conversation_memory().render("Previous interactions with the user:")
 
         # Construct the prompt dynamically
         prompt = (
@@ -1014,7 +1047,7 @@ def generate_robot_response(form_data, extra_prompt: str = ""):
 
             Previous Agent Interactions:
             {previous_responses}
-            {crisis_support_resources}
+            {crisis_resources_for_prompt(category)}
 
             Extra Prompt:
             {extra_prompt if extra_prompt else ""}
@@ -1034,22 +1067,54 @@ def generate_robot_response(form_data, extra_prompt: str = ""):
         )
         print(prompt)
 
+        status = status or st.empty()
+        if stream:
+            return stream_robot_response(
+                stream_in_turn(llm_api_key, status, lambda: model.generate_content(prompt, stream=True))
+            )
+
         # Generate the response
-        response = model.generate_content(prompt)
+        with gemini_turn(llm_api_key, status):
+            response = model.generate_content(prompt)
 
         # Check if the response contains candidates
         if response.candidates and len(response.candidates) > 0:
             candidate = response.candidates[0]
             if candidate.finish_reason == "SAFETY":
-                return "I'm here to support you! It's great that you've recognized this issue. Acknowledging your feelings is a significant step towards growth, and I'm here to help you through this journey."
+                return ROBOT_FALLBACK_RESPONSE
             else:
                 return candidate.content.parts[0].text.strip()
         else:
-            return "I'm here to support you! It's great that you've recognized this issue. Acknowledging your feelings is a significant step towards growth, and I'm here to help you through this journey."
+            return ROBOT_FALLBACK_RESPONSE
+
+    except SchedulerBusy:
+        st.warning(BUSY_MESSAGE)
+        return [ROBOT_ERROR_RESPONSE] if stream else ROBOT_ERROR_RESPONSE
+    except Exception as e:
+        st.error(f"Error generating response: {str(e)}")
+        return [ROBOT_ERROR_RESPONSE] if stream else ROBOT_ERROR_RESPONSE
 
+def stream_robot_response(response):
+    """Yield the text of a streamed agent reply, falling back like the blocking path."""
+    streamed = False
+    try:
+        for text in chunk_texts(response):
+            if text:
+                streamed = True
+                yield text
+    except SchedulerBusy:
+        st.warning(BUSY_MESSAGE)
+        if not streamed:
+            yield ROBOT_ERROR_RESPONSE
+        return
     except Exception as e:
         st.error(f"Error generating response: {str(e)}")
-        return "I'm here to support you! Remember, every step you take is a step towards growth."
+        if not streamed:
+            yield ROBOT_ERROR_RESPONSE
+        return
+
+    if not streamed:
+        yield ROBOT_FALLBACK_RESPONSE
 
 def display_ai_response(step_name: str, gif_path: str, extra_prompt: str = "") -> str:
     """
@@ -1061,34 +1126,54 @@ def display_ai_response(step_name: str, gif_path: str, extra_prompt: str = "") -
     Returns:
         str: The generated response
     """
-    with st.spinner("Generating response... Please wait."):
-        # Generate and display the robot's response
-        robot_response = generate_robot_response(st.session_state.form_data, extra_prompt)
-        
-        # Store the response in session state with step name
-        if 'step_responses' not in st.session_state:
-            st.session_state.step_responses = {}
-        st.session_state.step_responses[step_name] = robot_response
-
-        # Display the GIF and the response
-        col1InResponse, col2InResponse = st.columns([1, 2])
-        
-        with col1InResponse:
-            st.image(gif_path, use_container_width=True)
-
-        with col2InResponse:
-            st.markdown(
-                f"""<div class='ai-response-container'>
-                    <p class='ai-response-text'>{robot_response}</p>
-                </div>""", 
-                unsafe_allow_html=True
-            )
-        
-        return robot_response
+    # Display the GIF and stream the response into the bubble as it arrives
+    col1InResponse, col2InResponse = st.columns([1, 2])
+
+    with col1InResponse:
+        # By URL: given a file path, st.image re-encodes a WebP to a still PNG
+        if gif_path:
+            st.image(image_url(gif_path), use_container_width=True)
+
+    with col2InResponse:
+        bubble = st.empty()
+        bubble.markdown(render_response_bubble("…"), unsafe_allow_html=True)
+
+        robot_response = ""
+        for text in generate_robot_response(st.session_state.form_data, extra_prompt, stream=True, status=bubble):
+            robot_response += text
+            bubble.markdown(render_response_bubble(robot_response + " ▌"), unsafe_allow_html=True)
+
+        robot_response = robot_response.strip()
+        bubble.markdown(render_response_bubble(robot_response), unsafe_allow_html=True)
+
+    # Store the response in session state with step name
+    if 'step_responses' not in st.session_state:
+        st.session_state.step_responses = {}
+    st.session_state.step_responses[step_name] = robot_response
+    get_conversation_memory().record(step_name, robot_response)
+
+    return robot_response
+
+def get_conversation_memory() -> ConversationMemory:
+    """The session's bounded agent-reply memory, seeded from any existing step responses."""
+    if "conversation_memory" not in st.session_state:
+        memory = ConversationMemory()
+        for step, response in st.session_state.get("step_responses", {}).items():
+            memory.record(step, response)
+        st.session_state.conversation_memory = memory
+    return st.session_state.conversation_memory
+
+def render_response_bubble(text: str) -> str:
+    return f"""<div class='ai-response-container'>
+                    <p class='ai-response-text'>{text}</p>
+                </div>"""
     
 
-def get_gif_path(step_name: str) -> str:
-    return f"./static/gif/{step_name}.gif"
+def get_gif_path(step_name: str) -> str | None:
+    # Resized, fingerprinted WebP from home.asset_build when it has been built;
+    # None for steps without an animation (e.g. the final step)
+    name = f"step-{step_name}"
+    return asset_path(name) if name in ASSET_SOURCES else None
 
 def display_agent_section(step_name: str, gif_path: str, extra_prompt: str = ""):
     """
@@ -1107,11 +1192,10 @@ def display_agent_section(step_name: str, gif_path: str, extra_prompt: str = "")
         if "step_responses" in st.session_state and step_name in st.session_state.step_responses:
             col1InResponse, col2InResponse = st.columns([1, 5])
             with col1InResponse:
-                st.image(gif_path, use_container_width=True)
+                if gif_path:
+                    st.image(image_url(gif_path), use_container_width=True)
             with col2InResponse:
                 st.markdown(
-                    f"""<div class='ai-response-container'>
-                        <p class='ai-response-text'>last response: {st.session_state.step_responses[step_name]}</p>
-                    </div>""", 
+                    render_response_bubble(f"last response: {st.session_state.step_responses[step_name]}"),
                     unsafe_allow_html=True
                 )
\ No newline at end of file
@@ -0,0 +1,95 @@
+import functools
+import hashlib
+import json
+import os
+import re
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+# Page CSS is minified once per process and added to the page's <head> once
+# per session. A <style> block sent through st.markdown only lives until the
+# next rerun, so it had to be re-sent on every click; a stylesheet placed in
+# the parent document's head by a zero-size component outlives reruns.
+
+# Print how many bytes of CSS each rerun sent
+STYLE_REPORT = os.environ.get("HERSPACE_STYLE_REPORT", "0") == "1"
+
+_INJECTED_KEY = "_injected_styles"
+_BYTES_KEY = "_style_bytes_this_run"
+
+
+@functools.lru_cache(maxsize=64)
+def minify_css(css):
+    """Drop comments and insignificant whitespace."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    # Spaces before ':' are kept; they're significant in selectors like "div :hover"
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+@functools.lru_cache(maxsize=None)
+def load_stylesheet(path):
+    """A CSS file's contents, read once per process."""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _injection_script(styles):
+    # json.dumps doesn't escape "</", which would end the script element early
+    payload = json.dumps(styles).replace("</", "<\\/")
+    return f"""
+        <script>
+        const doc = parent.document;
+        for (const [id, css] of Object.entries({payload})) {{
+            let style = doc.getElementById(id);
+            if (!style) {{
+                style = doc.createElement("style");
+                style.id = id;
+                doc.head.appendChild(style);
+            }}
+            style.textContent = css;
+        }}
+        </script>
+    """
+
+
+def inject_styles(name, css):
+    """
+    Add css, minified, to the page head under `name`, unless this session
+    already has it.
+
+    Re-injecting a name with different css replaces the earlier stylesheet.
+
+    Returns:
+        int: Bytes sent to the browser for it on this rerun
+    """
+    css = minify_css(css)
+    digest = hashlib.sha1(css.encode("utf-8")).hexdigest()
+    injected = st.session_state.setdefault(_INJECTED_KEY, {})
+    if injected.get(name) == digest:
+        return 0
+
+    script = _injection_script({f"herspace-style-{name}": css})
+    components.html(script, height=0, width=0)
+    injected[name] = digest
+
+    sent = len(script.encode("utf-8"))
+    st.session_state[_BYTES_KEY] = st.session_state.get(_BYTES_KEY, 0) + sent
+    return sent
+
+
+def remove_styles(name):
+    """Empty a stylesheet added by inject_styles, if this session has it."""
+    if st.session_state.get(_INJECTED_KEY, {}).get(name):
+        inject_styles(name, "")
+
+
+def report_style_bytes():
+    """Bytes of CSS sent since the last call; call once at the end of each rerun."""
+    sent = st.session_state.pop(_BYTES_KEY, 0)
+    if STYLE_REPORT:
+        print(f"Style bytes sent this rerun: {sent}")
+    return sent
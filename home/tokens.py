@@ -0,0 +1,26 @@
+import re
+
+
+# Rough sub-word split: words, digit runs and single punctuation marks. Tracks
+# Gemini's tokenizer closely enough for budgeting without an API round trip.
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text):
+    """Estimate the number of model tokens in text."""
+    return len(_TOKEN_RE.findall(text or ""))
+
+
+
+def truncate_to_tokens(text, max_tokens, suffix="…"):
+    """Cut text down to roughly max_tokens, ending on a word boundary."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    matches = list(_TOKEN_RE.finditer(text))
+    if max_tokens <= 0 or not matches:
+        return ""
+    cut = matches[max_tokens - 1].end()
+    space = text.rfind(" ", 0, cut)
+    if space > 0:
+        cut = space
+    return text[:cut].rstrip() + suffix
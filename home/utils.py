@@ -1,18 +1,24 @@
 import streamlit as st
-import google.generativeai as genai
+from home.key_validation import validate_api_key as check_api_key
+
+ADMIN_PASSPHRASE = "admin2024"
 
 def validate_api_key(api_key):
+    """Validate a Gemini key with a cached, lightweight probe."""
     try:
-        genai.configure(api_key=api_key)
-        return True
+        result = check_api_key(api_key)
     except Exception as e:
-        st.error(f"Invalid API Key: {e}")
+        st.error(f"Could not reach Gemini to check the API key: {e}")
         return False
+    if not result:
+        st.error(f"Invalid API Key: {result.error}")
+    return result.valid
 
 def handle_api_key_change():
     # This function will be called when the API key input changes
     api_key = st.session_state.gemini_api_key_input  # Access the input value
-    if api_key:  # Check if the API key is not empty
+    if api_key and api_key != ADMIN_PASSPHRASE:  # Check if the API key is not empty
+        # The outcome is cached, so get_api_key's check on this rerun doesn't probe again
         if validate_api_key(api_key):  # Validate the API key
             st.success("API Key validated successfully!")
         else:
@@ -37,16 +43,17 @@ def get_api_key():
 
     if user_api_key:
         try:
-            if user_api_key == "admin2024":
+            if user_api_key == ADMIN_PASSPHRASE:
                 user_api_key = st.secrets["GEMINI_API_KEY"]
                 st.session_state.gemini_api_key = user_api_key
                 st.success("API Key validated successfully!")
                 return user_api_key
 
             else:
-                genai.configure(api_key=user_api_key)
-                model = genai.GenerativeModel('gemini-pro')
-                response = model.generate_content("Hello, can you confirm my API key is working?")
+                result = check_api_key(user_api_key)
+                if not result:
+                    st.error(f"API Key validation failed: {result.error}")
+                    return None
                 st.session_state.gemini_api_key = user_api_key
                 st.success("API Key validated successfully!")
                 return user_api_key
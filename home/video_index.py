@@ -0,0 +1,157 @@
+import argparse
+import datetime
+import json
+import math
+import os
+import re
+
+from home.categories import PREDEFINED_CATEGORIES, video_search_query
+
+# Offline YouTube recommendations for the predefined topic categories. The
+# index is built ahead of time and loaded once at startup, so the response page
+# only calls the YouTube Data API live for custom "Other" categories.
+#
+# Build or refresh it with:
+#     python -m home.video_index --api-key $GOOGLE_API_KEY
+
+INDEX_VERSION = 1
+INDEX_PATH = os.path.join(os.path.dirname(__file__), "data", "video_index.json")
+
+# How many search hits are considered per category before filtering and ranking
+CANDIDATES_PER_CATEGORY = 25
+VIDEOS_PER_CATEGORY = 5
+# Skip shorts and hour-long streams
+MIN_DURATION_SECONDS = 120
+MAX_DURATION_SECONDS = 60 * 60
+
+_DURATION_RE = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?")
+
+
+def parse_duration(iso_duration):
+    """Seconds in an ISO 8601 duration such as 'PT12M5S'."""
+    match = _DURATION_RE.fullmatch(iso_duration or "")
+    if not match:
+        return 0
+    days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def score_video(views, likes):
+    """Popularity (log views) boosted by how well-liked the video is."""
+    like_ratio = likes / views if views else 0.0
+    return math.log10(views + 1) * (1 + min(like_ratio, 0.1) * 10)
+
+
+def fetch_category_videos(youtube, category, max_results=VIDEOS_PER_CATEGORY):
+    """Search, filter and rank the videos for one category."""
+    search_response = youtube.search().list(
+        q=video_search_query(category),
+        part='id',
+        maxResults=CANDIDATES_PER_CATEGORY,
+        type='video',
+        videoEmbeddable='true',
+        relevanceLanguage='en',
+        safeSearch='strict'
+    ).execute()
+    video_ids = [item['id']['videoId'] for item in search_response.get('items', [])
+                 if item['id']['kind'] == 'youtube#video']
+    if not video_ids:
+        return []
+
+    details = youtube.videos().list(
+        id=",".join(video_ids),
+        part='snippet,contentDetails,statistics,status'
+    ).execute()
+
+    videos = []
+    for item in details.get('items', []):
+        snippet = item['snippet']
+        statistics = item.get('statistics', {})
+        duration = parse_duration(item['contentDetails'].get('duration'))
+        if item['status'].get('privacyStatus') != 'public' or not item['status'].get('embeddable', False):
+            continue
+        if snippet.get('liveBroadcastContent', 'none') != 'none':
+            continue
+        if not MIN_DURATION_SECONDS <= duration <= MAX_DURATION_SECONDS:
+            continue
+
+        views = int(statistics.get('viewCount', 0))
+        likes = int(statistics.get('likeCount', 0))
+        videos.append({
+            'title': snippet['title'],
+            'description': snippet['description'],
+            'video_id': item['id'],
+            'thumbnail': snippet['thumbnails']['medium']['url'],
+            'duration_seconds': duration,
+            'views': views,
+            'score': round(score_video(views, likes), 4)
+        })
+
+    videos.sort(key=lambda video: video['score'], reverse=True)
+    return videos[:max_results]
+
+
+def build_index(api_key, categories=PREDEFINED_CATEGORIES, max_results=VIDEOS_PER_CATEGORY):
+    from googleapiclient.discovery import build
+
+    youtube = build('youtube', 'v3', developerKey=api_key, cache_discovery=False)
+    index = {
+        "version": INDEX_VERSION,
+        "built_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "categories": {}
+    }
+    for category in categories:
+        index["categories"][category] = fetch_category_videos(youtube, category, max_results)
+        print(f"{category}: {len(index['categories'][category])} videos")
+    return index
+
+
+def write_index(index, path=INDEX_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+
+
+def load_index(path=INDEX_PATH):
+    """The {category: videos} mapping from the index file, or {} if missing or outdated."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Could not load video index {path}: {e}")
+        return {}
+
+    if index.get("version") != INDEX_VERSION:
+        print(f"Ignoring video index {path}: version {index.get('version')}, expected {INDEX_VERSION}")
+        return {}
+    return index.get("categories", {})
+
+
+_index = load_index()
+
+
+def indexed_videos(category):
+    """Pre-built recommendations for a predefined category, or None if it isn't indexed."""
+    videos = _index.get(category)
+    return videos if videos else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline YouTube index for the predefined categories.")
+    parser.add_argument("--api-key", default=os.environ.get("GOOGLE_API_KEY"),
+                        help="YouTube Data API key (defaults to $GOOGLE_API_KEY)")
+    parser.add_argument("--output", default=INDEX_PATH, help="Where to write the index")
+    parser.add_argument("--per-category", type=int, default=VIDEOS_PER_CATEGORY,
+                        help="Videos kept per category")
+    args = parser.parse_args()
+    if not args.api_key:
+        parser.error("an API key is required (--api-key or $GOOGLE_API_KEY)")
+
+    write_index(build_index(args.api_key, max_results=args.per_category), args.output)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from home.cache import TTLCache
+from home.categories import video_search_query
+from home.video_index import indexed_videos
+
+
+# Search results are the same for every user in a category, so keep them a while
+YOUTUBE_CACHE_TTL_SECONDS = int(os.environ.get("HERSPACE_YOUTUBE_CACHE_TTL", str(6 * 3600)))
+YOUTUBE_CACHE_SIZE = int(os.environ.get("HERSPACE_YOUTUBE_CACHE_SIZE", "256"))
+# How long the response page waits for videos once the Gemini response is done
+VIDEO_TIMEOUT_SECONDS = float(os.environ.get("HERSPACE_VIDEO_TIMEOUT", "10"))
+
+# Hit/miss counters are available through video_cache.stats()
+video_cache = TTLCache(max_size=YOUTUBE_CACHE_SIZE, ttl_seconds=YOUTUBE_CACHE_TTL_SECONDS)
+
+_clients = {}
+_clients_lock = threading.Lock()
+# httplib2 connections aren't thread-safe, so each script thread gets its own
+_thread_local = threading.local()
+# Video lookups run here so they overlap with the Gemini call on the response page
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="herspace-videos")
+
+
+def get_youtube_client(api_key):
+    """The process-wide YouTube client for api_key; the discovery document is loaded once."""
+    with _clients_lock:
+        youtube = _clients.get(api_key)
+        if youtube is None:
+            # Imported on first use; googleapiclient is slow to import and only the response page needs it
+            from googleapiclient.discovery import build
+
+            youtube = build('youtube', 'v3', developerKey=api_key, cache_discovery=False)
+            _clients[api_key] = youtube
+        return youtube
+
+
+def _thread_http():
+    http = getattr(_thread_local, "http", None)
+    if http is None:
+        import httplib2
+
+        http = _thread_local.http = httplib2.Http(timeout=10)
+    return http
+
+
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+def search_youtube_videos(query, api_key, max_results=5):
+    """
+    Search for YouTube videos related to the situation
+    """
+    cache_key = (normalize_query(query), max_results)
+    videos = video_cache.get(cache_key)
+    if videos is not None:
+        return videos
+
+    from googleapiclient.errors import HttpError
+
+    try:
+        youtube = get_youtube_client(api_key)
+        
+        # Call the search.list method to retrieve results matching the specified query term
+        search_response = youtube.search().list(
+            q=query,
+            part='id,snippet',
+            maxResults=max_results,
+            type='video',
+            relevanceLanguage='en',
+            safeSearch='strict'
+        ).execute(http=_thread_http())
+        
+        videos = []
+        for search_result in search_response.get('items', []):
+            if search_result['id']['kind'] == 'youtube#video':
+                videos.append({
+                    'title': search_result['snippet']['title'],
+                    'description': search_result['snippet']['description'],
+                    'video_id': search_result['id']['videoId'],
+                    'thumbnail': search_result['snippet']['thumbnails']['medium']['url']
+                })
+        
+        video_cache.set(cache_key, videos)
+        return videos
+    
+    except HttpError as e:
+        # Errors aren't cached so the next user retries
+        print(f'An HTTP error {e.resp.status} occurred: {e.content}')
+        return []
+
+
+
+def recommended_videos(category, api_key, max_results=5):
+    """Videos for a category: from the offline index when built, otherwise a live search."""
+    videos = indexed_videos(category)
+    if videos is None:
+        search_query = video_search_query(category)
+        print(search_query)
+        videos = search_youtube_videos(query=search_query, api_key=api_key, max_results=max_results)
+    return videos
+
+
+def fetch_recommended_videos(category, api_key, max_results=5):
+    """Start recommended_videos on the shared thread pool and return its Future."""
+    return _executor.submit(recommended_videos, category, api_key, max_results)
@@ -0,0 +1,220 @@
+import html
+import json
+import os
+import re
+
+from home.tokens import estimate_tokens
+
+# Crisis support resources, loaded from data/crisis_resources.json and indexed
+# by country and issue type (domestic violence, sexual assault, LGBTQ+, ...).
+# The Safe Hub page and the prompts both render from this registry; prompts
+# only get the issues relevant to the user's topic.
+
+REGISTRY_PATH = os.path.join(os.path.dirname(__file__), "data", "crisis_resources.json")
+REGISTRY_VERSION = 1
+
+# Country used when the user's region is unknown or has no resources yet
+DEFAULT_COUNTRY = os.environ.get("HERSPACE_CRISIS_COUNTRY", "US")
+# Token budget for the crisis resources section of a prompt
+CRISIS_TOKEN_BUDGET = int(os.environ.get("HERSPACE_CRISIS_TOKEN_BUDGET", "450"))
+
+
+def _keyword_pattern(keywords):
+    """
+    One regex for an issue's topic keywords.
+
+    A keyword matches whole words, plus a plural "s"/"es"; one ending in "*"
+    is a stem and matches any word starting with it ("harass*" matches
+    "harassment"). So "kid" matches "kids" but not "kidney".
+    """
+    alternatives = []
+    for keyword in keywords:
+        keyword = keyword.lower()
+        if keyword.endswith("*"):
+            alternatives.append(r"\b" + re.escape(keyword[:-1]))
+        else:
+            alternatives.append(r"\b" + re.escape(keyword) + r"(?:e?s)?\b")
+    return re.compile("|".join(alternatives)) if alternatives else None
+
+
+class CrisisResource:
+    """One hotline or service, with its HTML and prompt renderings built once."""
+
+    def __init__(self, name, country, issues, phone=None, text=None, audience=None, url=None):
+        self.name = name
+        self.country = country
+        self.issues = issues
+        self.phone = phone
+        self.text = text
+        self.audience = audience
+        self.url = url
+        self.html = self._render_html()
+        self.prompt_line = self._render_prompt(with_url=True)
+        # Web-only services keep their link; it is their only contact
+        self.compact_prompt_line = self._render_prompt(with_url=not (phone or text))
+
+    def _contact_parts(self, phone):
+        parts = [f"{self.audience} -"] if self.audience else []
+        if phone:
+            parts.append(phone)
+        if self.text:
+            parts.append(self.text)
+        return parts
+
+    def _render_html(self):
+        phone = f"<strong>{html.escape(self.phone)}</strong>" if self.phone else None
+        parts = [f"{html.escape(self.name)}:"] + [
+            part if part is phone else html.escape(part) for part in self._contact_parts(phone)
+        ]
+        if self.url:
+            parts.append(f'<a href="{html.escape(self.url)}" target="_blank" class="yellow-link">Website Link</a>')
+        return " ".join(parts)
+
+    def _render_prompt(self, with_url):
+        line = f"- {self.name}"
+        contact = " ".join(self._contact_parts(self.phone))
+        if contact:
+            line += f": {contact}"
+        if with_url and self.url:
+            line += f" ({self.url})"
+        return line
+
+
+class CrisisRegistry:
+    """
+    Crisis resources indexed by country and issue.
+
+    The Safe Hub HTML for each country is rendered at load; prompt renderings
+    are built on first use for each (country, issues, budget) and cached.
+    """
+
+    def __init__(self, data):
+        self.intro = data["intro"]
+        self.note = data["note"]
+        self.countries = data["countries"]
+        self.issues = {issue: spec["label"] for issue, spec in data["issues"].items()}
+        self.keywords = {issue: _keyword_pattern(spec.get("keywords", []))
+                         for issue, spec in data["issues"].items()}
+        self.always_include = list(data.get("always_include", []))
+        self.categories = data.get("categories", {})
+        self.resources = [CrisisResource(**resource) for resource in data["resources"]]
+
+        self._index = {}  # (country, issue) -> [CrisisResource]
+        for resource in self.resources:
+            for issue in resource.issues:
+                if issue not in self.issues:
+                    raise ValueError(f"{resource.name} lists unknown issue {issue!r}")
+                self._index.setdefault((resource.country, issue), []).append(resource)
+
+        self.html = {country: self._render_html(country) for country in self.countries}
+        self._prompts = {}
+        for category in self.categories:
+            for country in self.countries:
+                self.prompt_text(category, country)
+
+    def resolve_country(self, country=None):
+        """country if it has resources, otherwise DEFAULT_COUNTRY."""
+        return country if country in self.countries else DEFAULT_COUNTRY
+
+    def resources_for(self, country=None, issue=None):
+        country = self.resolve_country(country)
+        if issue is not None:
+            return self._index.get((country, issue), [])
+        return [resource for resource in self.resources if resource.country == country]
+
+    def issues_for_category(self, category):
+        """
+        Issues relevant to a topic, in display order.
+
+        Predefined topics use their mapping; a custom topic is matched by
+        keyword, and gets every issue when nothing matches.
+        """
+        if category in self.categories:
+            wanted = set(self.categories[category])
+        else:
+            text = (category or "").lower()
+            wanted = {issue for issue, pattern in self.keywords.items()
+                      if pattern and pattern.search(text)}
+            if not wanted - set(self.always_include):
+                wanted = set(self.issues)
+        wanted.update(self.always_include)
+        return tuple(issue for issue in self.issues if issue in wanted)
+
+    def prompt_text(self, category=None, country=None, token_budget=CRISIS_TOKEN_BUDGET):
+        """
+        Plain-text resources relevant to a topic, for a prompt.
+
+        Links are dropped (except for web-only services) when the full
+        rendering doesn't fit token_budget; hotline numbers are never cut.
+        """
+        country = self.resolve_country(country)
+        cache_key = (country, self.issues_for_category(category), token_budget)
+        text = self._prompts.get(cache_key)
+        if text is None:
+            text = self._render_prompt(*cache_key)
+            self._prompts[cache_key] = text
+        return text
+
+    def _render_html(self, country):
+        sections = []
+        for issue, label in self.issues.items():
+            resources = self.resources_for(country, issue)
+            if not resources:
+                continue
+            items = "\n".join(f"                    <li>{resource.html}</li>" for resource in resources)
+            sections.append(f"""
+            <li><strong>{html.escape(label)}</strong>
+                <br><br>
+                <ul class="faq-answer">
+{items}
+                </ul>
+            </li>""")
+        return f"""
+    <div class="response-box crisis-support">
+            <p class="subtitle">{html.escape(self.intro)}</p>
+            <ul>{"".join(sections)}
+        </ul>
+        <p><em>{html.escape(self.note)}</em></p>
+
+    </div>
+"""
+
+    def _render_prompt(self, country, issues, token_budget):
+        renderings = []
+        for compact in (False, True):
+            lines = [f"Crisis Support Resources ({country}):"]
+            listed = set()
+            for issue in issues:
+                resources = [resource for resource in self.resources_for(country, issue) if resource.name not in listed]
+                if not resources:
+                    continue
+                lines.append(f"{self.issues[issue]}:")
+                for resource in resources:
+                    listed.add(resource.name)
+                    lines.append(resource.compact_prompt_line if compact else resource.prompt_line)
+            renderings.append("\n".join(lines))
+        for text in renderings:
+            if estimate_tokens(text) <= token_budget:
+                return text
+        return renderings[-1]
+
+
+def load_registry(path=REGISTRY_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != REGISTRY_VERSION:
+        raise ValueError(f"Crisis resources {path}: version {data.get('version')}, expected {REGISTRY_VERSION}")
+    return CrisisRegistry(data)
+
+
+registry = load_registry()
+
+
+def crisis_resources_html(country=None):
+    """The Safe Hub page's resource list for a country."""
+    return registry.html[registry.resolve_country(country)]
+
+
+def crisis_resources_for_prompt(category=None, country=None, token_budget=CRISIS_TOKEN_BUDGET):
+    """The crisis resources relevant to a topic, as plain text for a prompt."""
+    return registry.prompt_text(category, country, token_budget)
@@ -1,12 +1,13 @@
 import streamlit as st
 from st_pages import add_page_title, get_nav_from_toml
-import base64
+from home.assets import asset_path, asset_url
+from home.styles import inject_styles, load_stylesheet, remove_styles, report_style_bytes
 from streamlit_modal import Modal
 from streamlit.components.v1 import html
 
 def main():
     st.set_page_config(page_title="HerSpace", page_icon=":cherry_blossom:", layout="centered", initial_sidebar_state="auto", menu_items=None)
-    load_css("static/css/main.css")
+    load_css(asset_path("main-css"))
     set_background()
 
     nav = get_nav_from_toml(".streamlit/pages.toml")
@@ -16,18 +17,17 @@ def main():
     render_audio_player()
     set_footer()
     show_terms_of_use()
+    report_style_bytes()
 
 def load_css(file_path):
-    with open(file_path, "r") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    inject_styles("main", load_stylesheet(file_path))
 
 def set_background():
-    bin_str = get_base64_of_bin_file('static/images/background.png')
+    background_url = asset_url(asset_path('background'))
     
-    st.markdown(f"""
-        <style>
+    inject_styles("background", f"""
         [data-testid="stAppViewContainer"] {{
-            background-image: url("data:image/jpg;base64,{bin_str}");
+            background-image: url("{background_url}");
             background-size: cover;
             background-repeat: no-repeat;
             background-attachment: fixed;
@@ -41,8 +41,7 @@ def set_background():
             text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
             padding: 10px;
         }}
-        </style>
-        """, unsafe_allow_html=True)
+        """)
 
 
 def set_footer():
@@ -64,15 +63,15 @@ def set_footer():
 
 def render_audio_player():
     audio_files = {
-        "Calm Piano": "static/audio/calm_piano.wav",
-        "Nature Sounds": "static/audio/nature_music.wav",
+        "Calm Piano": "calm_piano",
+        "Nature Sounds": "nature_music",
     }
 
     # Add audio selection and player at the bottom of sidebar
     with st.sidebar:
         st.markdown("<br>" * 4, unsafe_allow_html=True)
 
-        st.image("static/images/recorder.png", use_container_width=True)
+        st.image(asset_path("recorder"), use_container_width=True)
         
         selected_audio = st.selectbox(
             "🎵 Select Music Generated by Google MusicFx:",
@@ -81,17 +80,10 @@ def render_audio_player():
             key="background_music_selectbox"
         )
         
-        audio_path = audio_files[selected_audio]
+        audio_path = asset_path(audio_files[selected_audio])
         st.audio(audio_path, format="audio/wav")
 
 
-# Extract background setting code into separate function
-def get_base64_of_bin_file(png_file):
-    with open(png_file, 'rb') as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
-
-
 def show_terms_of_use():
     """
     Display the Terms of Use modal for HerSpace AI
@@ -103,7 +95,8 @@ def show_terms_of_use():
         st.session_state.popup_closed = False
 
     if not st.session_state.popup_closed:
-        with modal.container():
+        inject_styles("terms-modal", modal.css())
+        with modal.container(emit_css=False):
             st.markdown("""
             <div style="height: 15px; overflow-y: scroll; padding-right: 10px; margin-bottom: 10px;">
             """, unsafe_allow_html=True)
@@ -166,6 +159,10 @@ def show_terms_of_use():
             if accepted:
                 close = st.button('Accept and Continue')
                 st.session_state.popup_closed = True
+    else:
+        # The modal's stylesheet outlives reruns; clear it so leftover
+        # modal markers in the page can't pick it up
+        remove_styles("terms-modal")
 
 
 if __name__ == "__main__":
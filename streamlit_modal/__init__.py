@@ -25,16 +25,14 @@ class Modal:
         if rerun_condition:
             st.rerun()
 
-    @contextmanager
-    def container(self):
+    def css(self):
+        """The modal's stylesheet, without the <style> tags."""
         if self.max_width:
             max_width = str(self.max_width) + "px"
         else:
             max_width = 'unset'
 
-        st.markdown(
-            f"""
-            <style>
+        return f"""
             div[data-modal-container='true'][key='{self.key}'] {{
                 position: fixed;
                 width: 100vw !important;
@@ -124,10 +122,17 @@ class Modal:
                 right: 0;
                 margin-top: {2*self.padding + 14}px;
             }}
-            </style>
-            """,
-            unsafe_allow_html=True
-        )
+            """
+
+    @contextmanager
+    def container(self, emit_css=True):
+        """
+        Args:
+            emit_css: Send the modal's stylesheet with it; pass False when
+                the caller adds Modal.css() to the page itself
+        """
+        if emit_css:
+            st.markdown(f"<style>{self.css()}</style>", unsafe_allow_html=True)
         with st.container():
             _container = st.container()
             if self.title:
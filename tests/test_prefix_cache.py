@@ -0,0 +1,134 @@
+import pytest
+
+from home.prefix_cache import PrefixCache
+
+MODEL = "models/test-model"
+PREFIX = "You are HerSpace, a supportive companion. " * 20
+TTL = 3600
+MARGIN = 300
+COOLDOWN = 600
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCacheBackend:
+    """Stands in for Gemini's cached-content API and counts the calls made."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.uploads = 0
+        self.refreshes = 0
+        self.fail_create = False
+        self.fail_refresh = False
+
+    def create(self, api_key, model_name, prefix, ttl_seconds):
+        if self.fail_create:
+            raise RuntimeError("cached content is too small")
+        self.uploads += 1
+        return f"cachedContents/{self.uploads}", self.clock() + ttl_seconds
+
+    def refresh(self, api_key, name, ttl_seconds):
+        if self.fail_refresh:
+            raise RuntimeError(f"{name} not found")
+        self.refreshes += 1
+        return self.clock() + ttl_seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def backend(clock):
+    return FakeCacheBackend(clock)
+
+
+@pytest.fixture
+def cache(backend, clock):
+    return PrefixCache(backend=backend, ttl_seconds=TTL, refresh_margin=MARGIN,
+                       failure_cooldown=COOLDOWN, clock=clock)
+
+
+def test_first_lookup_uploads(cache, backend):
+    assert cache.lookup("key", MODEL, PREFIX) == "cachedContents/1"
+    assert backend.uploads == 1
+    assert cache.stats["uploads"] == 1
+
+
+def test_repeat_lookup_is_a_hit(cache, backend):
+    cache.lookup("key", MODEL, PREFIX)
+    assert cache.lookup("key", MODEL, PREFIX) == "cachedContents/1"
+    assert backend.uploads == 1
+    assert cache.stats["hits"] == 1
+
+
+def test_each_key_and_prefix_uploads_separately(cache, backend):
+    cache.lookup("key", MODEL, PREFIX)
+    cache.lookup("other key", MODEL, PREFIX)
+    cache.lookup("key", MODEL, PREFIX + "changed")
+    assert backend.uploads == 3
+
+
+def test_refreshes_inside_the_margin(cache, backend, clock):
+    cache.lookup("key", MODEL, PREFIX)
+    clock.now += TTL - MARGIN + 1
+    assert cache.lookup("key", MODEL, PREFIX) == "cachedContents/1"
+    assert backend.refreshes == 1
+    assert backend.uploads == 1
+
+    # The refresh pushed the expiry out again
+    clock.now += MARGIN
+    assert cache.lookup("key", MODEL, PREFIX) == "cachedContents/1"
+    assert backend.refreshes == 1
+
+
+def test_failed_refresh_uploads_again(cache, backend, clock):
+    cache.lookup("key", MODEL, PREFIX)
+    backend.fail_refresh = True
+    clock.now += TTL - MARGIN + 1
+    assert cache.lookup("key", MODEL, PREFIX) == "cachedContents/2"
+    assert backend.uploads == 2
+
+
+def test_uploads_again_after_expiry(cache, backend, clock):
+    cache.lookup("key", MODEL, PREFIX)
+    clock.now += TTL + 1
+    assert cache.lookup("key", MODEL, PREFIX) == "cachedContents/2"
+    assert backend.uploads == 2
+    assert backend.refreshes == 0
+
+
+def test_failed_upload_falls_back_during_cooldown(cache, backend, clock):
+    backend.fail_create = True
+    assert cache.lookup("key", MODEL, PREFIX) is None
+
+    backend.fail_create = False
+    clock.now += COOLDOWN - 1
+    assert cache.lookup("key", MODEL, PREFIX) is None
+    assert backend.uploads == 0
+    assert cache.stats["fallbacks"] == 2
+
+    clock.now += 1
+    assert cache.lookup("key", MODEL, PREFIX) == "cachedContents/1"
+
+
+def test_cooldown_is_per_key(cache, backend):
+    backend.fail_create = True
+    cache.lookup("key", MODEL, PREFIX)
+    backend.fail_create = False
+    assert cache.lookup("other key", MODEL, PREFIX) == "cachedContents/1"
+
+
+def test_invalidate_forces_a_new_upload(cache, backend):
+    cache.lookup("key", MODEL, PREFIX)
+    cache.invalidate("key", MODEL, PREFIX)
+    assert cache.lookup("key", MODEL, PREFIX) == "cachedContents/2"
+    assert backend.uploads == 2
+    assert backend.refreshes == 0
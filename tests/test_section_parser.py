@@ -0,0 +1,90 @@
+import pytest
+
+from home.section_parser import SECTION_MARKERS, SectionStreamParser, parse_sections
+
+# A response recorded from the model, markers and all
+RECORDED_RESPONSE = """[VALIDATION_START]
+It makes sense that you feel overwhelmed right now.
+[VALIDATION_END]
+
+[INSIGHTS_START]
+* Stress at work often spills over into sleep.
+* You are already noticing the pattern, which is a strength.
+[INSIGHTS_END]
+[MILESTONES_START]
+* Week 1: Track when the worry peaks.
+[MILESTONES_END]
+[ACTIONS_START]
+* Try a 5-minute breathing break after lunch.
+[ACTIONS_END]
+[SUPPORT_START]
+You deserve support, and reaching out is a brave step.
+[SUPPORT_END]
+[GROWTH_START]
+Each small step builds resilience.
+[GROWTH_END]
+"""
+
+EXPECTED = {
+    "validation": "It makes sense that you feel overwhelmed right now.",
+    "insights": "• Stress at work often spills over into sleep.\n"
+                "• You are already noticing the pattern, which is a strength.",
+    "milestones": "• Week 1: Track when the worry peaks.",
+    "actions": "• Try a 5-minute breathing break after lunch.",
+    "support": "You deserve support, and reaching out is a brave step.",
+    "growth_overview": "Each small step builds resilience.",
+}
+
+
+def replay(chunks):
+    parser = SectionStreamParser()
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    events.extend(parser.close())
+    return events
+
+
+def test_parses_recorded_response():
+    assert parse_sections(RECORDED_RESPONSE) == EXPECTED
+
+
+@pytest.mark.parametrize("split", range(len(RECORDED_RESPONSE) + 1))
+def test_every_split_point(split):
+    events = replay([RECORDED_RESPONSE[:split], RECORDED_RESPONSE[split:]])
+    assert dict(events) == EXPECTED
+    assert len(events) == len(SECTION_MARKERS)
+
+
+def test_markers_split_across_chunks():
+    events = replay(list(RECORDED_RESPONSE))
+    assert [section for section, _ in events] == list(SECTION_MARKERS)
+    assert dict(events) == EXPECTED
+
+
+def test_section_reported_when_its_end_marker_arrives():
+    parser = SectionStreamParser()
+    assert parser.feed("[VALIDATION_START] You are heard. [VALIDATION_") == []
+    assert parser.feed("END] [INSIGHTS_START] partial") == [("validation", "You are heard.")]
+    assert parser.pending == ["insights", "milestones", "actions", "support", "growth_overview"]
+
+
+def test_duplicate_section_keeps_first_text():
+    text = "[INSIGHTS_START] first [INSIGHTS_END] [INSIGHTS_START] second [INSIGHTS_END]"
+    events = replay([text[:30], text[30:]])
+    assert [event for event in events if event[0] == "insights"] == [("insights", "first")]
+
+
+def test_unclosed_section_does_not_swallow_later_sections():
+    text = ("[VALIDATION_START] a [INSIGHTS_START] b [INSIGHTS_END] "
+            "[MILESTONES_START] c [MILESTONES_END]")
+    sections = parse_sections(text)
+    assert sections["validation"] == ""
+    assert sections["insights"] == "b"
+    assert sections["milestones"] == "c"
+    for split in range(len(text) + 1):
+        assert dict(replay([text[:split], text[split:]])) == sections
+
+
+def test_missing_sections_close_empty():
+    assert parse_sections("no markers at all") == {section: "" for section in SECTION_MARKERS}
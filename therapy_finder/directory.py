@@ -0,0 +1,149 @@
+import csv
+import math
+import os
+
+import numpy as np
+
+from therapy_finder.geo import EARTH_RADIUS_MILES
+from therapy_finder.places import place_location
+from therapy_finder.ranking import Candidates
+
+# A local therapist directory (e.g. an export of an open provider directory or
+# an OpenStreetMap extract) searched in-process, so results don't depend on
+# the Places API. Listings are bucketed into a fixed latitude/longitude grid;
+# a radius query only looks at the cells overlapping the search circle. The
+# ranking columns (see therapy_finder.ranking) are built once at load.
+#
+# The file is CSV, or Parquet when pandas can read it. Required columns:
+# name, latitude, longitude. Optional: id, address, phone, website, hours
+# (days separated by ";"), rating, user_ratings_total.
+
+DIRECTORY_SOURCE = "directory"
+# Grid cell size; 0.05 degrees of latitude is about 3.5 miles
+DIRECTORY_CELL_DEGREES = float(os.environ.get("HERSPACE_DIRECTORY_CELL_DEGREES", "0.05"))
+MILES_PER_DEGREE_LATITUDE = math.pi * EARTH_RADIUS_MILES / 180
+
+
+def _number(value, kind=float):
+    try:
+        return kind(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def listing_to_place(row, row_number):
+    """
+    A directory row in the shape of a Places result, or None if it has no usable location.
+
+    Contact fields are included directly, since there is no Details call for these.
+    """
+    latitude, longitude = _number(row.get("latitude")), _number(row.get("longitude"))
+    if not row.get("name") or latitude is None or longitude is None \
+            or not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        return None
+
+    place = {
+        "place_id": f"{DIRECTORY_SOURCE}:{row.get('id') or row_number}",
+        "name": row["name"],
+        "vicinity": row.get("address") or "Address not available",
+        "geometry": {"location": {"lat": latitude, "lng": longitude}},
+        "source": DIRECTORY_SOURCE,
+    }
+    for field, kind in (("rating", float), ("user_ratings_total", int)):
+        value = _number(row.get(field), kind)
+        if value is not None:
+            place[field] = value
+    if row.get("phone"):
+        place["formatted_phone_number"] = row["phone"]
+    if row.get("website"):
+        place["website"] = row["website"]
+    if row.get("hours"):
+        place["opening_hours"] = {"weekday_text": [day.strip() for day in row["hours"].split(";") if day.strip()]}
+    return place
+
+
+class TherapistDirectory:
+    """
+    Directory listings in a grid index, for radius and k-nearest queries.
+
+    Queries return Candidates, whose `places` are the matching listings.
+    """
+
+    def __init__(self, places, cell_degrees=DIRECTORY_CELL_DEGREES):
+        self.places = places
+        self.candidates = Candidates(places)
+        self.cell_degrees = cell_degrees
+        self.columns = math.ceil(360 / cell_degrees)
+        cells = {}
+        for index, place in enumerate(places):
+            cells.setdefault(self._cell(*place_location(place)), []).append(index)
+        self._cells = {cell: np.array(indices) for cell, indices in cells.items()}  # (row, column) -> listing indices
+
+    def __len__(self):
+        return len(self.places)
+
+    def _cell(self, latitude, longitude):
+        return (math.floor((latitude + 90) / self.cell_degrees),
+                math.floor((longitude + 180) / self.cell_degrees) % self.columns)
+
+    def _cells_around(self, latitude, longitude, radius_miles):
+        lat_span = radius_miles / MILES_PER_DEGREE_LATITUDE
+        south, _ = self._cell(max(latitude - lat_span, -90), longitude)
+        north, _ = self._cell(min(latitude + lat_span, 90), longitude)
+
+        # Longitude degrees shrink toward the poles; near them, scan every column
+        widest = min(max(abs(latitude) + lat_span, 0), 90)
+        cos_lat = math.cos(math.radians(widest))
+        if cos_lat < 1e-6 or radius_miles / (MILES_PER_DEGREE_LATITUDE * cos_lat) >= 180:
+            columns = range(self.columns)
+        else:
+            lon_span = radius_miles / (MILES_PER_DEGREE_LATITUDE * cos_lat)
+            _, west = self._cell(latitude, longitude - lon_span)
+            count = math.floor(2 * lon_span / self.cell_degrees) + 2
+            columns = [(west + offset) % self.columns for offset in range(min(count, self.columns))]
+
+        for row in range(south, north + 1):
+            for column in columns:
+                yield row, column
+
+    def within(self, latitude, longitude, radius_miles):
+        """Listings within radius_miles of the point, nearest first."""
+        cells = [self._cells[cell] for cell in self._cells_around(latitude, longitude, radius_miles)
+                 if cell in self._cells]
+        indices = np.concatenate(cells) if cells else np.array([], dtype=int)
+        distances = self.candidates.distances_from(latitude, longitude, indices)
+        inside = np.flatnonzero(distances <= radius_miles)
+        return self.candidates.take(indices[inside[np.argsort(distances[inside], kind="stable")]])
+
+    def nearest(self, latitude, longitude, k):
+        """The k listings closest to the point, nearest first."""
+        radius = self.cell_degrees * MILES_PER_DEGREE_LATITUDE
+        while True:
+            found = self.within(latitude, longitude, radius)
+            # Past half the Earth's circumference every listing is in range
+            if len(found) >= k or radius >= math.pi * EARTH_RADIUS_MILES:
+                return found.take(np.arange(min(k, len(found))))
+            radius *= 2
+
+
+def read_rows(path):
+    if path.endswith(".parquet"):
+        import pandas as pd
+
+        frame = pd.read_parquet(path)
+        return frame.astype(object).where(frame.notna(), None).to_dict("records")
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def load_directory(path, cell_degrees=DIRECTORY_CELL_DEGREES):
+    places, skipped = [], 0
+    for row_number, row in enumerate(read_rows(path), start=1):
+        place = listing_to_place(row, row_number)
+        if place is None:
+            skipped += 1
+        else:
+            places.append(place)
+    if skipped:
+        print(f"Therapist directory {path}: skipped {skipped} rows without a name or valid coordinates")
+    return TherapistDirectory(places, cell_degrees)
@@ -1,8 +1,13 @@
 import streamlit as st
-import folium
-from streamlit_folium import folium_static
-import googlemaps
-from geopy.geocoders import Nominatim
+from concurrent.futures import TimeoutError as FutureTimeoutError, as_completed
+from therapy_finder.geocoding import GeocodingUnavailable, geocode_address
+from therapy_finder.directory import DIRECTORY_SOURCE
+from therapy_finder.place_details import DETAILS_TIMEOUT_SECONDS, place_details
+from therapy_finder.providers import therapist_provider
+from therapy_finder.ranking import DEFAULT_SORT, SORT_ORDERS, rank_places
+
+# folium and streamlit_folium are imported inside the functions that use them,
+# so the page's controls render before those libraries load.
 
 
 def get_user_location():
@@ -17,22 +22,88 @@ def get_user_location():
         return 37.3387, 121.8853  # San Jose City coordinates
 
 def find_nearby_therapists(latitude, longitude, radius=5):
-    """Find nearby therapists using Google Places API"""
+    """
+    Find nearby therapists in the local directory, falling back to Google Places API
+
+    Returns:
+        NearbyPlaces: The results so far; later Places pages keep loading in the background
+    """
+    # Places results are cached per area; a smaller radius is filtered from an earlier, larger search
+    provider = therapist_provider(lambda: st.secrets["GOOGLE_API_KEY"])
+    return provider.search(latitude, longitude, radius)
+
+def fetch_place_details(therapists):
+    """
+    Start Place Details lookups for the given results.
+
+    Returns:
+        dict: place_id -> Future, for the places whose details aren't cached yet
+    """
+    place_ids = [therapist.get('place_id') for therapist in therapists if therapist.get('source') != DIRECTORY_SOURCE]
+    if not place_ids:
+        return {}
     GOOGLE_API_KEY = st.secrets["GOOGLE_API_KEY"]
-    gmaps = googlemaps.Client(key=GOOGLE_API_KEY)
-    
-    # Search for therapists and counseling centers
-    places_result = gmaps.places_nearby(
-        location=(latitude, longitude),
-        radius=radius * 1609.34,  # Convert miles to meters
-        type='health',
-        keyword='therapist OR counseling OR mental health'
-    )
-    
-    return places_result.get('results', [])
+    return place_details.request(GOOGLE_API_KEY, place_ids)
+
+def known_details(therapist):
+    """Contact details already at hand: directory listings carry their own."""
+    if therapist.get('source') == DIRECTORY_SOURCE:
+        return therapist
+    return place_details.get(therapist.get('place_id'))
+
+def render_therapist_card(therapist, details=None, loading=False, distance=None):
+    """Show one result, with its phone, website and hours once details are in."""
+    open_now = therapist.get('opening_hours', {}).get('open_now')
+    lines = [
+        f"### {therapist.get('name', 'Unnamed Location')}",
+        "",
+        f"- 📍 **Address:** {therapist.get('vicinity', 'Address not available')}",
+    ]
+    if distance is not None:
+        lines.append(f"- 🚗 **Distance:** {distance:.1f} miles")
+    lines += [
+        f"- ⭐ **Rating:** {therapist.get('rating', 'Not rated')} / 5",
+        f"- 🏥 **Open Now:** {'Unknown' if open_now is None else 'Yes' if open_now else 'No'}",
+    ]
+    details = details or {}
+    if details.get('formatted_phone_number'):
+        lines.append(f"- 📞 **Phone:** {details['formatted_phone_number']}")
+    if details.get('website'):
+        lines.append(f"- 🌐 **Website:** [{details['website']}]({details['website']})")
+    if loading:
+        lines.append("- ⏳ *Loading contact details...*")
+    st.markdown("\n".join(lines))
+
+    hours = details.get('opening_hours', {}).get('weekday_text')
+    if hours:
+        with st.expander("🕒 Opening Hours"):
+            st.markdown("\n".join(f"- {day}" for day in hours))
+    st.markdown("---")
+
+def show_details_when_ready(cards, futures):
+    """Re-render each card in place as its details arrive."""
+    pending = {futures[place_id]: card for place_id, card in cards.items() if place_id in futures}
+    try:
+        for future in as_completed(pending, timeout=DETAILS_TIMEOUT_SECONDS):
+            card_box, therapist, distance = pending.pop(future)
+            try:
+                details = future.result()
+            except Exception as e:
+                print(f"Error loading place details: {e}")
+                details = None
+            with card_box.container():
+                render_therapist_card(therapist, details, distance=distance)
+    except FutureTimeoutError:
+        pass
+    # Anything still loading is shown without details; the next visit picks them up from the cache
+    for card_box, therapist, distance in pending.values():
+        with card_box.container():
+            render_therapist_card(therapist, distance=distance)
 
 def create_map(latitude, longitude, therapists):
     """Create an interactive map with therapist locations"""
+    import folium
+
     m = folium.Map(location=[latitude, longitude], zoom_start=12)
     
     # Add user's location marker
@@ -68,6 +139,8 @@ def therapy_finder_page():
         max_value=20,
         value=5
     )
+
+    sort_by = st.selectbox("Sort Results By", list(SORT_ORDERS), index=list(SORT_ORDERS).index(DEFAULT_SORT))
     
     # Location input
     location_option = st.radio(
@@ -83,37 +156,66 @@ def therapy_finder_page():
     else:
         address = st.text_input("Enter your address")
         if address:
-            geolocator = Nominatim(user_agent="therapy_finder")
-            location = geolocator.geocode(address)
-            if location:
-                latitude, longitude = location.latitude, location.longitude
+            # Cached per address, so moving the radius slider doesn't geocode again
+            try:
+                coordinates = geocode_address(address)
+            except GeocodingUnavailable as e:
+                st.error(f"The address lookup service is busy right now. Please try again shortly. ({e})")
             else:
-                st.error("Could not find coordinates for the given address")
+                if coordinates:
+                    latitude, longitude = coordinates
+                else:
+                    st.error("Could not find coordinates for the given address")
     
     if latitude and longitude:
         with st.spinner('Finding nearby therapists...'):
-            therapists = find_nearby_therapists(latitude, longitude, radius)
+            try:
+                nearby = find_nearby_therapists(latitude, longitude, radius)
+            except Exception as e:
+                st.error(f"Therapist search is unavailable right now. Please try again later. ({e})")
+                return
+        therapists = nearby.places
         
         if therapists:
             st.success(f"Found {len(therapists)} therapy locations within {radius} miles")
             
             # Display therapist details with enhanced formatting
-            for therapist in therapists[:5]:  # Limit to first 5 results
-                st.markdown(f"""
-                ### {therapist.get('name', 'Unnamed Location')}
-                
-                - 📍 **Address:** {therapist.get('vicinity', 'Address not available')}
-                - ⭐ **Rating:** {therapist.get('rating', 'Not rated')} / 5
-                - 🏥 **Open Now:** {'Yes' if therapist.get('opening_hours', {}).get('open_now', False) else 'No'}
-                
-                ---
-                """)
+            ranked = rank_places(therapists, latitude, longitude, SORT_ORDERS[sort_by], radius, limit=5,
+                                 candidates=nearby.candidates)  # Top 5 results
+            details_futures = fetch_place_details([therapist for therapist, _ in ranked])
+            cards = {}
+            for therapist, distance in ranked:
+                place_id = therapist.get('place_id')
+                card_box = st.empty()
+                with card_box.container():
+                    render_therapist_card(therapist, known_details(therapist), loading=place_id in details_futures,
+                                          distance=distance)
+                cards[place_id] = (card_box, therapist, distance)
             # Create and display map
+            from streamlit_folium import folium_static
+
             map_obj = create_map(latitude, longitude, therapists)
             folium_static(map_obj)
+
+            # Cards fill in with phone, website and hours as the lookups finish
+            show_details_when_ready(cards, details_futures)
         
-        else:
+        elif nearby.complete:
             st.warning("No therapy locations found in the selected radius.")
 
+        if not nearby.complete:
+            watch_for_more_places(latitude, longitude, radius, nearby.pages)
+
+def watch_for_more_places(latitude, longitude, radius, pages_shown):
+    """Poll while later result pages load, and rerun the page when one arrives."""
+    @st.fragment(run_every=1.0)
+    def poll():
+        nearby = find_nearby_therapists(latitude, longitude, radius)
+        if nearby.pages != pages_shown or nearby.complete:
+            st.rerun()
+        st.caption("🔄 Loading more results...")
+
+    poll()
+
 
 therapy_finder_page()
\ No newline at end of file
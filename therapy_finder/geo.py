@@ -0,0 +1,71 @@
+import math
+
+# Small geographic helpers shared by the therapy finder's caches and providers.
+
+EARTH_RADIUS_MILES = 3958.8
+METERS_PER_MILE = 1609.34
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, in miles."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+def geohash_encode(latitude, longitude, precision=6):
+    """The geohash of a point, `precision` characters long."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        value, interval = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def geohash_bounds(geohash):
+    """(south, west, north, east) of a geohash cell."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            interval = lon_range if even else lat_range
+            mid = (interval[0] + interval[1]) / 2
+            if value >> shift & 1:
+                interval[0] = mid
+            else:
+                interval[1] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def geohash_cell(latitude, longitude, precision=6):
+    """
+    The geohash cell containing a point.
+
+    Returns:
+        tuple: (geohash, center latitude, center longitude, miles from the
+            center to the cell's farthest corner)
+    """
+    geohash = geohash_encode(latitude, longitude, precision)
+    south, west, north, east = geohash_bounds(geohash)
+    center_lat, center_lon = (south + north) / 2, (west + east) / 2
+    half_diagonal = max(haversine_miles(center_lat, center_lon, lat, lon)
+                        for lat in (south, north) for lon in (west, east))
+    return geohash, center_lat, center_lon, half_diagonal
@@ -0,0 +1,194 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from home.cache import TTLCache
+
+# Address geocoding for the therapy finder through OpenStreetMap's Nominatim.
+# Nominatim allows at most one request per second per application, so every
+# lookup in the process goes through one shared rate limiter, and results
+# (including "not found") are cached by normalized address.
+
+NOMINATIM_USER_AGENT = "therapy_finder"
+# Nominatim's usage policy: no more than one request per second
+NOMINATIM_MIN_INTERVAL_SECONDS = 1.0
+# Longest a lookup waits for its turn before giving up
+GEOCODE_MAX_WAIT_SECONDS = float(os.environ.get("HERSPACE_GEOCODE_MAX_WAIT", "10"))
+GEOCODE_CACHE_SIZE = int(os.environ.get("HERSPACE_GEOCODE_CACHE_SIZE", "4096"))
+# Addresses rarely move; misses are retried sooner in case of a transient miss upstream
+GEOCODE_TTL_SECONDS = float(os.environ.get("HERSPACE_GEOCODE_TTL", str(7 * 24 * 3600)))
+GEOCODE_NEGATIVE_TTL_SECONDS = float(os.environ.get("HERSPACE_GEOCODE_NEGATIVE_TTL", "600"))
+# Optional SQLite file that keeps results across restarts
+GEOCODE_CACHE_PATH = os.environ.get("HERSPACE_GEOCODE_CACHE_PATH")
+
+# Cached in place of coordinates for addresses Nominatim couldn't find
+NOT_FOUND = ()
+
+
+class GeocodingUnavailable(Exception):
+    """Raised when the geocoding service can't be reached or the wait for a turn is too long."""
+
+
+def normalize_address(address):
+    """Case, spacing and punctuation differences shouldn't cost another lookup."""
+    address = address.casefold()
+    address = re.sub(r"\s*,\s*", ", ", address)
+    # "1/2" and "1.5" are part of the address; other punctuation and dots (e.g. "St.") aren't
+    address = re.sub(r"[^\w\s,#/.-]", "", address)
+    address = re.sub(r"(?<!\d)\.|\.(?!\d)", "", address)
+    return re.sub(r"\s+", " ", address).strip(" ,")
+
+
+class RateLimiter:
+    """
+    Spaces calls at least `min_interval` seconds apart across all threads.
+
+    Callers reserve the next free slot in arrival order and sleep until it,
+    so concurrent lookups queue up instead of bursting.
+    """
+
+    def __init__(self, min_interval, clock=time.monotonic, sleep=time.sleep):
+        self.min_interval = min_interval
+        self.clock = clock
+        self.sleep = sleep
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, max_wait=None):
+        """Block until the caller's slot; raises GeocodingUnavailable if it's further than max_wait."""
+        with self._lock:
+            now = self.clock()
+            slot = max(now, self._next_slot)
+            if max_wait is not None and slot - now > max_wait:
+                raise GeocodingUnavailable("Too many address lookups are waiting; please try again shortly.")
+            self._next_slot = slot + self.min_interval
+        if slot > now:
+            self.sleep(slot - now)
+
+
+class SQLiteGeocodeStore:
+    """Disk copy of geocoding results so they survive restarts."""
+
+    def __init__(self, path, clock=time.time):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS geocodes ("
+                "address TEXT PRIMARY KEY, latitude REAL, longitude REAL, expires_at REAL)"
+            )
+
+    def get(self, address):
+        """(coordinates or NOT_FOUND, seconds left), or None if absent or expired."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT latitude, longitude, expires_at FROM geocodes WHERE address = ?", (address,)
+            ).fetchone()
+        if row is None:
+            return None
+        latitude, longitude, expires_at = row
+        remaining = expires_at - self.clock()
+        if remaining <= 0:
+            return None
+        return (NOT_FOUND if latitude is None else (latitude, longitude)), remaining
+
+    def set(self, address, coordinates, ttl_seconds):
+        latitude, longitude = coordinates or (None, None)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?)",
+                (address, latitude, longitude, self.clock() + ttl_seconds)
+            )
+
+
+class NominatimBackend:
+    """Looks addresses up with geopy's Nominatim client, built once."""
+
+    def __init__(self, user_agent=NOMINATIM_USER_AGENT, timeout=10):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self._geolocator = None
+
+    def geocode(self, address):
+        """(latitude, longitude), or None when Nominatim has no match."""
+        from geopy.exc import GeopyError
+        from geopy.geocoders import Nominatim
+
+        if self._geolocator is None:
+            self._geolocator = Nominatim(user_agent=self.user_agent, timeout=self.timeout)
+        try:
+            location = self._geolocator.geocode(address)
+        except GeopyError as e:
+            raise GeocodingUnavailable(f"Address lookup failed: {e}") from e
+        return (location.latitude, location.longitude) if location else None
+
+
+class Geocoder:
+    """
+    Cached, rate-limited geocoding.
+
+    Results are kept in an in-memory LRU (and the optional disk store) under
+    the normalized address; misses are cached for a shorter time. Concurrent
+    lookups of the same address share one request.
+    """
+
+    def __init__(self, backend=None, rate_limiter=None, store=None, cache_size=GEOCODE_CACHE_SIZE,
+                 ttl_seconds=GEOCODE_TTL_SECONDS, negative_ttl_seconds=GEOCODE_NEGATIVE_TTL_SECONDS,
+                 max_wait=GEOCODE_MAX_WAIT_SECONDS):
+        self.backend = backend or NominatimBackend()
+        self.rate_limiter = rate_limiter or RateLimiter(NOMINATIM_MIN_INTERVAL_SECONDS)
+        self.store = store
+        self.cache = TTLCache(max_size=cache_size, ttl_seconds=ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_wait = max_wait
+        self.lookups = 0
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def geocode(self, address):
+        """
+        Returns:
+            tuple: (latitude, longitude), or None if the address wasn't found
+
+        Raises:
+            GeocodingUnavailable: The service failed or the queue was too long
+        """
+        key = normalize_address(address)
+        if not key:
+            return None
+
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            coordinates = self._cached(key)
+            if coordinates is None:
+                self.rate_limiter.wait(self.max_wait)
+                self.lookups += 1
+                coordinates = self.backend.geocode(address) or NOT_FOUND
+                ttl = self.ttl_seconds if coordinates else self.negative_ttl_seconds
+                self.cache.set(key, coordinates, ttl)
+                if self.store is not None:
+                    self.store.set(key, coordinates, ttl)
+        with self._lock:
+            self._locks.pop(key, None)
+        return coordinates or None
+
+    def _cached(self, key):
+        coordinates = self.cache.get(key)
+        if coordinates is None and self.store is not None:
+            stored = self.store.get(key)
+            if stored is not None:
+                coordinates, remaining = stored
+                self.cache.set(key, coordinates, remaining)
+        return coordinates
+
+
+geocoder = Geocoder(store=SQLiteGeocodeStore(GEOCODE_CACHE_PATH) if GEOCODE_CACHE_PATH else None)
+
+
+def geocode_address(address):
+    return geocoder.geocode(address)
@@ -0,0 +1,77 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from home.cache import TTLCache
+from therapy_finder.places import places_cache
+
+# Place Details (phone, website, opening hours) for the therapist cards.
+# Nearby search doesn't return contact fields, so the cards shown are enriched
+# with one Details call each, run concurrently on a small pool and cached by
+# place_id. Only the contact fields are requested, which keeps responses
+# small and the calls in the cheaper billing tier.
+
+DETAILS_FIELDS = ("formatted_phone_number", "website", "opening_hours")
+DETAILS_TTL_SECONDS = float(os.environ.get("HERSPACE_PLACE_DETAILS_TTL", str(24 * 3600)))
+DETAILS_CACHE_SIZE = int(os.environ.get("HERSPACE_PLACE_DETAILS_CACHE_SIZE", "4096"))
+DETAILS_WORKERS = int(os.environ.get("HERSPACE_PLACE_DETAILS_WORKERS", "4"))
+# Longest the page waits for details before showing the cards without them
+DETAILS_TIMEOUT_SECONDS = float(os.environ.get("HERSPACE_PLACE_DETAILS_TIMEOUT", "10"))
+
+
+class PlaceDetailsCache:
+    """
+    Place Details cached by place_id, fetched on a bounded thread pool.
+
+    Concurrent requests for the same place share one call. Failed lookups
+    aren't cached, so the next page load tries again.
+    """
+
+    def __init__(self, backend=None, fields=DETAILS_FIELDS, ttl_seconds=DETAILS_TTL_SECONDS,
+                 max_size=DETAILS_CACHE_SIZE, max_workers=DETAILS_WORKERS):
+        self.backend = backend or places_cache.backend
+        self.fields = tuple(fields)
+        self.details = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self.lookups = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="herspace-details")
+        self._in_flight = {}  # place_id -> Future of the running lookup
+        self._lock = threading.Lock()
+
+    def get(self, place_id):
+        """Cached details for a place, or None."""
+        return self.details.get(place_id)
+
+    def request(self, api_key, place_ids):
+        """
+        Start lookups for the places whose details aren't cached.
+
+        Returns:
+            dict: place_id -> Future of its details, for the places still loading
+        """
+        futures = {}
+        for place_id in place_ids:
+            if not place_id or self.details.get(place_id) is not None:
+                continue
+            with self._lock:
+                future = self._in_flight.get(place_id)
+                if future is None:
+                    # Finished between the cache check and taking the lock
+                    if self.details.get(place_id) is not None:
+                        continue
+                    future = self._executor.submit(self._lookup, api_key, place_id)
+                    self._in_flight[place_id] = future
+            futures[place_id] = future
+        return futures
+
+    def _lookup(self, api_key, place_id):
+        try:
+            self.lookups += 1
+            details = self.backend.details(api_key, place_id, self.fields)
+            self.details.set(place_id, details)
+            return details
+        finally:
+            with self._lock:
+                self._in_flight.pop(place_id, None)
+
+
+place_details = PlaceDetailsCache()
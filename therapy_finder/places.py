@@ -0,0 +1,244 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from home.cache import TTLCache
+from therapy_finder.geo import METERS_PER_MILE, geohash_cell, haversine_miles
+from therapy_finder.ranking import Candidates
+
+# Google Places nearby search for the therapy finder, cached by geohash cell.
+# Searches are made around the cell's center, so a repeat of the same radius
+# from anywhere in the cell is a cache hit. Nearby Search returns at most 60
+# places, ranked by prominence rather than distance, so a wider search only
+# answers a smaller one (by filtering locally) when it returned every place
+# in its circle; otherwise the smaller radius is fetched on its own.
+#
+# Nearby Search returns up to three pages of 20. The first page is returned
+# right away; later pages are fetched on a background worker and merged into
+# the cell's results as they arrive.
+
+PLACE_TYPE = "health"
+PLACE_KEYWORD = "therapist OR counseling OR mental health"
+# Geohash length of a cache cell; 6 is about 1.2 km x 0.6 km
+PLACES_CELL_PRECISION = int(os.environ.get("HERSPACE_PLACES_CELL_PRECISION", "6"))
+PLACES_TTL_SECONDS = float(os.environ.get("HERSPACE_PLACES_TTL", str(24 * 3600)))
+PLACES_CACHE_SIZE = int(os.environ.get("HERSPACE_PLACES_CACHE_SIZE", "1024"))
+# Nearby Search's largest allowed radius is 50 km
+MAX_RADIUS_MILES = 50000 / METERS_PER_MILE
+MAX_PAGES = 3
+PAGE_SIZE = 20
+# A next_page_token only becomes valid a short while after it is issued
+PAGE_TOKEN_DELAY_SECONDS = 2.0
+PAGE_TOKEN_RETRIES = 3
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="herspace-places")
+
+
+def place_location(place):
+    location = place["geometry"]["location"]
+    return location["lat"], location["lng"]
+
+
+class PageTokenNotReady(Exception):
+    """The next_page_token was used before Google activated it."""
+
+
+class NearbyPlaces:
+    """
+    Places found around a point, and whether more pages are still loading.
+
+    `candidates` holds the places' ranking columns when the source keeps them
+    prebuilt (see therapy_finder.ranking), otherwise None.
+    """
+
+    def __init__(self, places, pages, complete, candidates=None):
+        self.places = places
+        self.pages = pages
+        self.complete = complete
+        self.candidates = candidates
+
+
+class CellEntry:
+    """
+    Results of one nearby search around a cell's center.
+
+    Pages after the first are appended by a background worker; results are
+    deduplicated by place_id.
+    """
+
+    def __init__(self, center_lat, center_lon, radius_miles, results, next_page_token=None):
+        self.center_lat = center_lat
+        self.center_lon = center_lon
+        self.radius_miles = radius_miles
+        self.results = []
+        self.received = 0  # before deduplication, to tell whether Google's cap was hit
+        self.pages = 0
+        self.complete = next_page_token is None
+        self.error = None
+        self._candidates = None
+        self._place_ids = set()
+        self._lock = threading.Lock()
+        self.add_page(results)
+
+    def add_page(self, results):
+        with self._lock:
+            for place in results:
+                place_id = place.get("place_id")
+                if place_id in self._place_ids:
+                    continue
+                self._place_ids.add(place_id)
+                self.results.append(place)
+            self.received += len(results)
+            self.pages += 1
+
+    def fetch_remaining(self, backend, api_key, next_page_token, delay=PAGE_TOKEN_DELAY_SECONDS):
+        """Follow next_page_token until the last page; runs on a background worker."""
+        try:
+            while next_page_token and self.pages < MAX_PAGES:
+                for attempt in range(PAGE_TOKEN_RETRIES):
+                    time.sleep(delay)
+                    try:
+                        results, next_page_token = backend.next_page(api_key, next_page_token)
+                        break
+                    except PageTokenNotReady:
+                        if attempt == PAGE_TOKEN_RETRIES - 1:
+                            raise
+                self.add_page(results)
+        except Exception as e:
+            print(f"Fetching more places failed: {e}")
+            self.error = e
+        finally:
+            self.complete = True
+
+    @property
+    def exhaustive(self):
+        """Whether every place in the circle was returned: paging finished and the result cap wasn't hit."""
+        return self.complete and self.error is None and self.received < MAX_PAGES * PAGE_SIZE
+
+    def covers(self, latitude, longitude, radius_miles):
+        """Whether these results hold every place within radius_miles of the point."""
+        if not self.exhaustive:
+            return False
+        if self.radius_miles >= MAX_RADIUS_MILES:
+            return True
+        distance = haversine_miles(self.center_lat, self.center_lon, latitude, longitude)
+        return distance + radius_miles <= self.radius_miles
+
+    def candidates(self):
+        """Ranking columns of the results so far, rebuilt only when a page is added."""
+        with self._lock:
+            if self._candidates is None or len(self._candidates) != len(self.results):
+                self._candidates = Candidates(list(self.results))
+            return self._candidates
+
+    def within(self, latitude, longitude, radius_miles):
+        # Read completion before the results, so a snapshot reported complete holds every page
+        complete, pages = self.complete, self.pages
+        candidates = self.candidates()
+        nearby = candidates.take(np.flatnonzero(candidates.distances_from(latitude, longitude) <= radius_miles))
+        return NearbyPlaces(nearby.places, pages, complete, nearby)
+
+
+class GooglePlacesBackend:
+    """Nearby search and place details through googlemaps, with one client per API key."""
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def client(self, api_key):
+        import googlemaps
+
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                client = self._clients[api_key] = googlemaps.Client(key=api_key)
+            return client
+
+    def nearby(self, api_key, latitude, longitude, radius_miles):
+        """The first page of results and the token for the next one (None if it's the last)."""
+        response = self.client(api_key).places_nearby(
+            location=(latitude, longitude),
+            radius=radius_miles * METERS_PER_MILE,
+            type=PLACE_TYPE,
+            keyword=PLACE_KEYWORD
+        )
+        return response.get("results", []), response.get("next_page_token")
+
+    def next_page(self, api_key, page_token):
+        from googlemaps.exceptions import ApiError
+
+        try:
+            response = self.client(api_key).places_nearby(page_token=page_token)
+        except ApiError as e:
+            if e.status == "INVALID_REQUEST":
+                raise PageTokenNotReady() from e
+            raise
+        return response.get("results", []), response.get("next_page_token")
+
+    def details(self, api_key, place_id, fields):
+        """Place Details limited to `fields`; Google bills by the fields requested."""
+        response = self.client(api_key).place(place_id, fields=list(fields))
+        return response.get("result", {})
+
+
+class PlacesCache:
+    """
+    Nearby-search results cached per geohash cell and radius, with a TTL.
+
+    Searches are fetched around the cell center, padded by the cell's
+    half-diagonal so every later search from inside the cell with the same
+    radius is covered. The cell's widest search also answers smaller radii,
+    but only once it is known to be exhaustive.
+    """
+
+    def __init__(self, backend=None, precision=PLACES_CELL_PRECISION, ttl_seconds=PLACES_TTL_SECONDS,
+                 max_size=PLACES_CACHE_SIZE):
+        self.backend = backend or GooglePlacesBackend()
+        self.precision = precision
+        self.cells = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self.fetches = 0
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def search(self, api_key, latitude, longitude, radius_miles):
+        """
+        Places within radius_miles of the point, from the cache when possible.
+
+        Returns:
+            NearbyPlaces: What has arrived so far; search again to pick up
+                later pages until `complete` is set
+        """
+        geohash, center_lat, center_lon, half_diagonal = geohash_cell(latitude, longitude, self.precision)
+        with self._lock:
+            lock = self._locks.setdefault(geohash, threading.Lock())
+
+        fetch_radius = min(radius_miles + half_diagonal, MAX_RADIUS_MILES)
+        search_key = (geohash, round(fetch_radius, 6))
+
+        # One fetch per cell even when several sessions search it at once
+        with lock:
+            entry = self.cells.get(search_key)
+            if entry is None:
+                widest = self.cells.get(geohash)
+                if widest is not None and widest.covers(latitude, longitude, radius_miles):
+                    entry = widest
+            if entry is None:
+                results, next_page_token = self.backend.nearby(api_key, center_lat, center_lon, fetch_radius)
+                self.fetches += 1
+                entry = CellEntry(center_lat, center_lon, fetch_radius, results, next_page_token)
+                self.cells.set(search_key, entry)
+                widest = self.cells.get(geohash)
+                if widest is None or fetch_radius >= widest.radius_miles:
+                    self.cells.set(geohash, entry)
+                if next_page_token:
+                    _executor.submit(entry.fetch_remaining, self.backend, api_key, next_page_token)
+        with self._lock:
+            self._locks.pop(geohash, None)
+        return entry.within(latitude, longitude, radius_miles)
+
+
+places_cache = PlacesCache()
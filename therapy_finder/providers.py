@@ -0,0 +1,94 @@
+import os
+from abc import ABC, abstractmethod
+
+from therapy_finder.directory import load_directory
+from therapy_finder.places import NearbyPlaces, places_cache
+
+# Where therapy finder results come from. The local directory answers first,
+# when one is configured; Google Places is the fallback for areas it doesn't
+# cover, and the directory keeps the page working when the Places quota runs out.
+
+THERAPIST_DIRECTORY_PATH = os.environ.get(
+    "HERSPACE_THERAPIST_DIRECTORY",
+    os.path.join(os.path.dirname(__file__), "data", "therapists.csv")
+)
+
+
+class TherapistProvider(ABC):
+    """A source of therapy locations."""
+
+    name = None
+
+    @abstractmethod
+    def search(self, latitude, longitude, radius_miles):
+        """
+        Returns:
+            NearbyPlaces: Places within radius_miles of the point
+        """
+
+
+class DirectoryProvider(TherapistProvider):
+    """Searches a local TherapistDirectory."""
+
+    name = "directory"
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def search(self, latitude, longitude, radius_miles):
+        nearby = self.directory.within(latitude, longitude, radius_miles)
+        return NearbyPlaces(nearby.places, pages=1, complete=True, candidates=nearby)
+
+
+class GooglePlacesProvider(TherapistProvider):
+    """Google Places nearby search, through the shared per-cell cache."""
+
+    name = "google"
+
+    def __init__(self, get_api_key, cache=places_cache):
+        self.get_api_key = get_api_key
+        self.cache = cache
+
+    def search(self, latitude, longitude, radius_miles):
+        return self.cache.search(self.get_api_key(), latitude, longitude, radius_miles)
+
+
+class FallbackProvider(TherapistProvider):
+    """
+    Asks each provider in turn and returns the first one with results.
+
+    A provider that fails is skipped; its error is raised only when no
+    provider found anything.
+    """
+
+    name = "fallback"
+
+    def __init__(self, providers):
+        self.providers = providers
+
+    def search(self, latitude, longitude, radius_miles):
+        result, error = NearbyPlaces([], pages=0, complete=True), None
+        for provider in self.providers:
+            try:
+                result = provider.search(latitude, longitude, radius_miles)
+            except Exception as e:
+                print(f"Therapist search through {provider.name} failed: {e}")
+                error = e
+                continue
+            if result.places:
+                return result
+        if error is not None:
+            raise error
+        return result
+
+
+# Loaded once per process; None when no directory file is present
+therapist_directory = load_directory(THERAPIST_DIRECTORY_PATH) if os.path.exists(THERAPIST_DIRECTORY_PATH) else None
+
+
+def therapist_provider(get_api_key):
+    """The local directory (when there is one) with Google Places as the fallback."""
+    providers = [GooglePlacesProvider(get_api_key)]
+    if therapist_directory is not None:
+        providers.insert(0, DirectoryProvider(therapist_directory))
+    return FallbackProvider(providers)
@@ -0,0 +1,142 @@
+import numpy as np
+
+from therapy_finder.geo import EARTH_RADIUS_MILES
+
+# Ranking of therapy finder results. All candidates are scored in one NumPy
+# pass: distance from the user, rating (pulled toward a prior for places with
+# few reviews), review count and whether the place is open now.
+
+# Label shown in the sort control -> ranking key
+SORT_ORDERS = {
+    "Best match": "score",
+    "Nearest": "distance",
+    "Highest rated": "rating",
+    "Most reviewed": "reviews",
+}
+DEFAULT_SORT = "Best match"
+# Weights of the best-match score's parts; they sum to 1
+SCORE_WEIGHTS = {"distance": 0.4, "rating": 0.3, "reviews": 0.15, "open_now": 0.15}
+# A rating counts fully only once it has about this many reviews behind it
+PRIOR_RATING = 3.5
+PRIOR_REVIEWS = 10
+
+
+def _open_now(place):
+    open_now = place.get("opening_hours", {}).get("open_now")
+    return np.nan if open_now is None else float(open_now)
+
+
+class Candidates:
+    """
+    The numeric columns of a list of places, extracted once for ranking.
+
+    Built once per cached search or directory load; the subset for a query
+    is taken with take(), so the place dicts aren't read again on each rerun.
+    """
+
+    def __init__(self, places):
+        self.places = places
+        count = len(places)
+        locations = [place["geometry"]["location"] for place in places]
+        self.latitudes = np.fromiter((location["lat"] for location in locations), float, count)
+        self.longitudes = np.fromiter((location["lng"] for location in locations), float, count)
+        self.ratings = np.fromiter((place.get("rating", np.nan) for place in places), float, count)
+        self.reviews = np.fromiter((place.get("user_ratings_total", 0) for place in places), float, count)
+        self.open_now = np.fromiter((_open_now(place) for place in places), float, count)
+
+    def __len__(self):
+        return len(self.places)
+
+    def take(self, indices):
+        """The candidates at `indices`, in that order."""
+        subset = Candidates.__new__(Candidates)
+        places = self.places
+        subset.places = [places[i] for i in np.asarray(indices, dtype=int).tolist()]
+        for column in ("latitudes", "longitudes", "ratings", "reviews", "open_now"):
+            setattr(subset, column, getattr(self, column)[indices])
+        return subset
+
+    def distances_from(self, latitude, longitude, indices=None):
+        """Miles from the point to each candidate, or to the candidates at `indices`."""
+        if indices is None:
+            return haversine_miles_array(latitude, longitude, self.latitudes, self.longitudes)
+        return haversine_miles_array(latitude, longitude, self.latitudes[indices], self.longitudes[indices])
+
+
+def haversine_miles_array(latitude, longitude, latitudes, longitudes):
+    """Great-circle distances from one point to arrays of points, in miles."""
+    phi1, phi2 = np.radians(latitude), np.radians(latitudes)
+    d_phi = phi2 - phi1
+    d_lambda = np.radians(longitudes - longitude)
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def scores(candidates, distances, radius_miles=None):
+    """Best-match scores in [0, 1]; higher is better."""
+    scale = radius_miles or (distances.max() if len(distances) else 0) or 1.0
+    nearness = 1 - np.clip(distances / scale, 0, 1)
+
+    rated = ~np.isnan(candidates.ratings)
+    rated_reviews = np.where(rated, candidates.reviews, 0)
+    rating = np.where(rated, candidates.ratings, 0) * rated_reviews
+    rating = (rating + PRIOR_RATING * PRIOR_REVIEWS) / (rated_reviews + PRIOR_REVIEWS) / 5
+
+    most_reviews = candidates.reviews.max() if len(candidates) else 0
+    reviews = np.log1p(candidates.reviews) / np.log1p(most_reviews) if most_reviews > 0 else np.zeros(len(candidates))
+
+    # Unknown opening status counts half
+    open_now = np.where(np.isnan(candidates.open_now), 0.5, candidates.open_now)
+
+    return (SCORE_WEIGHTS["distance"] * nearness + SCORE_WEIGHTS["rating"] * rating
+            + SCORE_WEIGHTS["reviews"] * reviews + SCORE_WEIGHTS["open_now"] * open_now)
+
+
+def _best(primary, distances, limit=None):
+    """Indices by descending primary, nearest first on ties; only the top `limit` are sorted."""
+    indices = np.arange(len(primary))
+    if limit is not None and limit < len(primary):
+        # Keep everything tied with the limit-th best so the tie-break stays exact
+        cutoff = -np.partition(-primary, limit - 1)[limit - 1]
+        indices = np.flatnonzero(primary >= cutoff)
+    # lexsort sorts by its last key first; negate for descending
+    return indices[np.lexsort((distances[indices], -primary[indices]))][:limit]
+
+
+def rank(candidates, latitude, longitude, order="score", radius_miles=None, limit=None):
+    """
+    Order candidates by one of the SORT_ORDERS keys; ties go to the nearer place.
+
+    Returns:
+        tuple: (indices into candidates in rank order, at most `limit` of them;
+            distances in miles for every candidate)
+    """
+    distances = candidates.distances_from(latitude, longitude)
+    if order == "distance":
+        primary = -distances
+    elif order == "rating":
+        primary = np.nan_to_num(candidates.ratings, nan=-1.0)
+    elif order == "reviews":
+        primary = candidates.reviews
+    elif order == "score":
+        primary = scores(candidates, distances, radius_miles)
+    else:
+        raise ValueError(f"Unknown sort order {order!r}")
+    return _best(primary, distances, limit), distances
+
+
+def rank_places(places, latitude, longitude, order="score", radius_miles=None, limit=None, candidates=None):
+    """
+    Args:
+        candidates: Candidates already built for `places` (e.g. NearbyPlaces.candidates);
+            extracted from the place dicts when not given
+
+    Returns:
+        list: (place, distance in miles) pairs in rank order, at most `limit` of them
+    """
+    if not places:
+        return []
+    if candidates is None:
+        candidates = Candidates(places)
+    indices, distances = rank(candidates, latitude, longitude, order, radius_miles, limit)
+    return [(places[i], float(distances[i])) for i in indices.tolist()]